@@ -0,0 +1,156 @@
+# backend/answers.py
+
+"""
+Precomputed answers for recurring queries.
+
+An offline step ranks a list of popular queries (the labeled queries in
+`data/train_test_data.csv` plus any in `data/popular_queries.txt`) and
+stores the ranked catalog row ids in a compact JSON table keyed by both the
+exact and the normalized query text. The API answers those queries from the
+table without touching the model, including while the model is still
+loading. The table records the catalog version, recommender fingerprint and
+a digest of the query list it was built with, and is rebuilt when any of
+them changes.
+
+    python -m backend.answers [--queries more_queries.txt] [--top-k 10]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from backend.catalog import Catalog
+
+FORMAT_VERSION = 2
+DEFAULT_QUERY_SOURCES = ("data/train_test_data.csv", "data/popular_queries.txt")
+_NON_WORD = re.compile(r"[^\w+#.]+")
+
+
+def normalize_query(query: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a query.
+
+    `+`, `#` and inner dots survive so that C++, C# and .NET stay distinct.
+    """
+    tokens = (t.rstrip(".") for t in _NON_WORD.sub(" ", query.lower()).split())
+    return " ".join(t for t in tokens if t)
+
+
+def _key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def queries_digest(queries: Iterable[str]) -> str:
+    """Order-sensitive hash of the query list a table was built from."""
+    return _key("\n".join(q.strip() for q in queries))
+
+
+def load_popular_queries(paths: Iterable[Path]) -> List[str]:
+    """Read queries from CSVs (a `Query` column) and plain text files (one per line)."""
+    queries: List[str] = []
+    for path in map(Path, paths):
+        if not path.exists():
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            if path.suffix == ".csv":
+                queries.extend(row["Query"] for row in csv.DictReader(f))
+            else:
+                queries.extend(f.read().splitlines())
+    return list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+
+
+class AnswerTable:
+    def __init__(self, data: dict, catalog: Catalog) -> None:
+        self.catalog = catalog
+        self.catalog_version: str = data["catalog_version"]
+        self.fingerprint: str = data["fingerprint"]
+        self.top_k: int = data["top_k"]
+        self.queries_digest: str = data["queries_digest"]
+        self._results: List[List[int]] = data["results"]
+        self._exact = data["exact"]
+        self._normalized = data["normalized"]
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def lookup(self, query: str, top_k: int = 10) -> Optional[List[int]]:
+        if top_k > self.top_k:
+            return None
+        row = self._exact.get(_key(query.strip()))
+        if row is None:
+            row = self._normalized.get(_key(normalize_query(query)))
+        return None if row is None else self._results[row][:top_k]
+
+    def is_current(self, fingerprint: Optional[str] = None, queries: Optional[List[str]] = None) -> bool:
+        if self.catalog_version != self.catalog.version:
+            return False
+        if queries is not None and queries_digest(queries) != self.queries_digest:
+            return False
+        return fingerprint is None or fingerprint == self.fingerprint
+
+    @classmethod
+    def load(cls, path: Path, catalog: Catalog) -> Optional["AnswerTable"]:
+        path = Path(path)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("format") != FORMAT_VERSION:
+            return None
+        return cls(data, catalog)
+
+
+def build_answer_table(recommender, queries: List[str], out_path: Path, top_k: int = 10) -> AnswerTable:
+    results: List[List[int]] = []
+    exact, normalized = {}, {}
+    for q in queries:
+        exact.setdefault(_key(q.strip()), len(results))
+        normalized.setdefault(_key(normalize_query(q)), len(results))
+        results.append([idx for idx, _ in recommender.rank(q, top_k=top_k, use_cache=False)])
+    data = {
+        "format": FORMAT_VERSION,
+        "catalog_version": recommender.catalog.version,
+        "fingerprint": recommender.fingerprint(),
+        "top_k": top_k,
+        "queries_digest": queries_digest(queries),
+        "results": results,
+        "exact": exact,
+        "normalized": normalized,
+    }
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(out_path)
+    return AnswerTable(data, recommender.catalog)
+
+
+def ensure_answer_table(recommender, path: Path, queries: List[str], top_k: int = 10) -> Optional[AnswerTable]:
+    """Load the table at `path`, rebuilding it if the catalog, model config or queries changed."""
+    table = AnswerTable.load(path, recommender.catalog)
+    if table is not None and table.is_current(recommender.fingerprint(), queries):
+        return table
+    if not queries:
+        return None
+    return build_answer_table(recommender, queries, path, top_k=top_k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute answers for popular queries")
+    parser.add_argument("--queries", nargs="*", default=[], help="Extra query files (.csv with Query column or .txt)")
+    parser.add_argument("--out", default="data/answers.json")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    from backend.recommender import Recommender
+
+    queries = load_popular_queries(list(DEFAULT_QUERY_SOURCES) + args.queries)
+    print(f"Ranking {len(queries)} popular queries...")
+    table = build_answer_table(Recommender(), queries, Path(args.out), top_k=args.top_k)
+    print(f"Saved {len(table)} answers to {args.out} (catalog version {table.catalog_version})")
+
+
+if __name__ == "__main__":
+    main()
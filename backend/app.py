@@ -1,34 +1,140 @@
 # backend/app.py
 
-from typing import Dict
+import os
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, Optional
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.answers import DEFAULT_QUERY_SOURCES, AnswerTable, ensure_answer_table, load_popular_queries
+from backend.catalog import load_catalog
+from backend.querylog import QueryLogWriter
+from backend.recommender import (
+    DEFAULT_FIELD_WEIGHTS, DEFAULT_MODEL_NAME, effective_field_weights, format_assessment, present_fields,
+    ranking_fingerprint,
+)
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+
 # This dictionary will safely hold our model instance after it's loaded.
 model_storage: Dict = {}
 
+def _load_recommender():
+    options = {}
+    if os.environ.get("SHL_SEMANTIC_CACHE_THRESHOLD"):
+        options["semantic_cache_threshold"] = float(os.environ["SHL_SEMANTIC_CACHE_THRESHOLD"])
+        options["semantic_cache_size"] = int(os.environ.get("SHL_SEMANTIC_CACHE_SIZE", "1024"))
+
+    if os.environ.get("SHL_TEST_MODE"):
+        # Fixture catalog + deterministic hashing encoder; boots in milliseconds.
+        from backend.offline import offline_recommender
+        return offline_recommender(**options)
+
+    from backend.recommender import Recommender
+    reranker = None
+    if os.environ.get("SHL_RERANK_MODEL"):
+        # Optional cross-encoder second stage; trades latency for recall.
+        from backend.reranker import CrossEncoderReranker
+        reranker = CrossEncoderReranker(
+            os.environ["SHL_RERANK_MODEL"],
+            budget_ms=float(os.environ.get("SHL_RERANK_BUDGET_MS", "150")),
+        )
+    return Recommender(
+        reranker=reranker, shards=int(os.environ.get("SHL_SEARCH_SHARDS", "0")), **options,
+    )
+
+def _popular_queries():
+    sources = [BASE_PATH / p for p in DEFAULT_QUERY_SOURCES]
+    if os.environ.get("SHL_POPULAR_QUERIES"):
+        sources.append(Path(os.environ["SHL_POPULAR_QUERIES"]))
+    return load_popular_queries(sources)
+
+def _expected_fingerprint(catalog) -> str:
+    """Fingerprint the recommender built by `_load_recommender` will have, without loading it."""
+    weights = effective_field_weights(DEFAULT_FIELD_WEIGHTS, present_fields(catalog))
+    return ranking_fingerprint(DEFAULT_MODEL_NAME, weights, rerank_model=os.environ.get("SHL_RERANK_MODEL"))
+
+def _answers_enabled() -> bool:
+    # SHL_ANSWER_TABLE=0 sends every query through the model, e.g. for load tests.
+    return os.environ.get("SHL_ANSWER_TABLE", "1") != "0"
+
+def _load_stored_answers():
+    """Answers from a previous build, servable before the model has loaded.
+
+    Tables built for another catalog, ranking configuration or query list are
+    ignored; the background load rebuilds them.
+    """
+    if os.environ.get("SHL_TEST_MODE") or not _answers_enabled():
+        return None
+    catalog = load_catalog(BASE_PATH / "data/assessments.csv", BASE_PATH / "data/catalog.bin")
+    table = AnswerTable.load(BASE_PATH / "data/answers.json", catalog)
+    if table is None or not table.is_current(_expected_fingerprint(catalog), _popular_queries()):
+        return None
+    return table
+
+def _load_model_and_answers(ready: threading.Event) -> None:
+    try:
+        recommender = _load_recommender()
+        model_storage["recommender"] = recommender
+        print("Lifespan event: REAL Recommender model loaded successfully.")
+        if not _answers_enabled():
+            return
+        # Rebuilds the table if the catalog, ranking config or query list changed.
+        answers_path = Path(recommender.catalog_path).with_name("answers.json")
+        table = ensure_answer_table(recommender, answers_path, _popular_queries())
+        if table is not None:
+            model_storage["answers"] = table
+            print(f"Lifespan event: {len(table)} precomputed answers ready.")
+        else:
+            model_storage.pop("answers", None)
+    except Exception:
+        print("--- LIFESPAN ERROR: FAILED TO LOAD RECOMMENDER ---")
+        traceback.print_exc()
+        print("-------------------------------------------------")
+    finally:
+        ready.set()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     This function handles the application's startup.
-    It loads the REAL recommender model when the app starts.
+    Precomputed answers are loaded first so popular queries are served
+    immediately; the REAL recommender model (or the offline fixture model
+    when SHL_TEST_MODE is set) then loads in the background.
     """
-    print("Lifespan event: Loading REAL Recommender model...")
     try:
-        from backend.recommender import Recommender
-        model_storage["recommender"] = Recommender()
-        print("Lifespan event: REAL Recommender model loaded successfully.")
-    except Exception as e:
-        import traceback
-        print("--- LIFESPAN ERROR: FAILED TO LOAD RECOMMENDER ---")
+        table = _load_stored_answers()
+        if table is not None:
+            model_storage["answers"] = table
+            print(f"Lifespan event: Serving {len(table)} precomputed answers.")
+    except Exception:
         traceback.print_exc()
-        print("-------------------------------------------------")
-    
+
+    if os.environ.get("SHL_QUERY_LOG_DIR"):
+        model_storage["query_log"] = QueryLogWriter(
+            Path(os.environ["SHL_QUERY_LOG_DIR"]),
+            sample_rate=float(os.environ.get("SHL_QUERY_LOG_SAMPLE", "1.0")),
+            redact_pii=os.environ.get("SHL_QUERY_LOG_REDACT", "1") != "0",
+        )
+
+    print("Lifespan event: Loading REAL Recommender model...")
+    model_storage["ready"] = threading.Event()
+    threading.Thread(
+        target=_load_model_and_answers, args=(model_storage["ready"],), daemon=True,
+    ).start()
+
     yield  # The application is now running.
     
     print("Lifespan event: Shutting down and clearing resources.")
+    if "recommender" in model_storage:
+        model_storage["recommender"].close()
+    if "query_log" in model_storage:
+        model_storage["query_log"].close()
     model_storage.clear()
 
 app = FastAPI(
@@ -55,16 +161,72 @@ app.add_middleware(
 
 class RecommendRequest(BaseModel):
     query: str = Field(..., description="User's free-text query or JD")
+    mmr_lambda: Optional[float] = Field(
+        None, ge=0.0, le=1.0,
+        description="Diversify results with MMR: 1.0 is pure relevance, lower values favour variety",
+    )
 
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    """503 until the background model load has finished and succeeded."""
+    event = model_storage.get("ready")
+    if event is None or not event.is_set():
+        raise HTTPException(status_code=503, detail="loading")
+    if "recommender" not in model_storage:
+        raise HTTPException(status_code=503, detail="failed")
+    return {"status": "ready"}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    recommender = model_storage.get("recommender")
+    if not recommender or recommender.cache is None:
+        raise HTTPException(status_code=404, detail="Semantic cache is not enabled.")
+    return recommender.cache.stats()
+
+def _log_query(req: RecommendRequest, query: str, start: float, source: str, status: int, results) -> None:
+    writer = model_storage.get("query_log")
+    if writer is None:
+        return
+    recommender = model_storage.get("recommender")
+    catalog = recommender.catalog if recommender else getattr(model_storage.get("answers"), "catalog", None)
+    writer.log({
+        "ts": time.time(),
+        "query": query,
+        "top_k": 10,
+        "mmr_lambda": req.mmr_lambda,
+        "source": source,
+        "status": status,
+        "latency_ms": round((time.perf_counter() - start) * 1000.0, 3),
+        "results": [r["url"] for r in results],
+        "catalog_version": catalog.version if catalog else None,
+        "model": recommender.fingerprint() if recommender else None,
+    })
+
 @app.post("/recommend")
 async def recommend(req: RecommendRequest):
+    start = time.perf_counter()
+    query = req.query.strip()
+    answers = model_storage.get("answers")
+    if answers is not None and req.mmr_lambda is None:
+        hit = answers.lookup(query, top_k=10)
+        if hit is not None:
+            results = [format_assessment(answers.catalog, i) for i in hit]
+            _log_query(req, query, start, "answers", 200, results)
+            return {"recommended_assessments": results}
+
     recommender = model_storage.get("recommender")
     if not recommender:
+        _log_query(req, query, start, "unavailable", 503, [])
         raise HTTPException(status_code=503, detail="Recommender model is not available or failed to load.")
     
-    results = recommender.recommend(req.query.strip(), top_k=10)
+    try:
+        results = recommender.recommend(query, top_k=10, mmr_lambda=req.mmr_lambda)
+    except Exception:
+        _log_query(req, query, start, "model", 500, [])
+        raise
+    _log_query(req, query, start, "model", 200, results)
     return {"recommended_assessments": results}
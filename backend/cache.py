@@ -0,0 +1,80 @@
+# backend/cache.py
+
+import threading
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Near-duplicate query cache keyed by query embedding.
+
+    Recent query embeddings live in a preallocated (capacity, dim) matrix, so
+    a lookup is one matrix-vector product. A cached result is returned when
+    the cosine similarity to a stored query is at least `threshold` and the
+    request parameters match. When full, the least recently used entry is
+    evicted.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024, threshold: float = 0.97) -> None:
+        self.capacity = capacity
+        self.threshold = threshold
+        self._keys = np.zeros((capacity, dim), dtype=np.float32)
+        self._values: List[Optional[object]] = [None] * capacity
+        self._params: List[Optional[Hashable]] = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, q: np.ndarray, params: Hashable = None) -> Optional[object]:
+        with self._lock:
+            if self._size:
+                sims = self._keys[:self._size] @ q
+                close = np.flatnonzero(sims >= self.threshold)
+                for slot in close[np.argsort(-sims[close])]:
+                    if self._params[slot] == params:
+                        self._clock += 1
+                        self._last_used[slot] = self._clock
+                        self.hits += 1
+                        return self._values[slot]
+            self.misses += 1
+            return None
+
+    def put(self, q: np.ndarray, value: object, params: Hashable = None) -> None:
+        with self._lock:
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+            self._clock += 1
+            self._keys[slot] = q
+            self._values[slot] = value
+            self._params[slot] = params
+            self._last_used[slot] = self._clock
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. when the rankings they hold are no longer valid."""
+        with self._lock:
+            self._values = [None] * self.capacity
+            self._params = [None] * self.capacity
+            self._last_used[:] = 0
+            self._size = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": self._size,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
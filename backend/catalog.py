@@ -0,0 +1,180 @@
+# backend/catalog.py
+
+"""
+Compact columnar catalog format.
+
+`data/assessments.csv` is compiled once into `data/catalog.bin`, which the
+serving path memory-maps instead of parsing the CSV with pandas. Layout:
+
+    magic (8 bytes) | header length (uint32) | JSON header | sections
+
+Every string column is stored as an offsets array (n_rows + 1 entries) plus
+a UTF-8 blob. Fixed-width attributes (currently the test type code) are
+plain little-endian arrays. Sections are 8-byte aligned so numpy can view
+them in place without copying.
+"""
+
+import csv
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+MAGIC = b"SHLCAT01"
+FORMAT_VERSION = 1
+
+
+def _align(n: int, to: int = 8) -> int:
+    return (n + to - 1) // to * to
+
+
+def catalog_version(csv_path: Path) -> str:
+    """Content hash of the source CSV; changes whenever the catalog does."""
+    return hashlib.blake2b(Path(csv_path).read_bytes(), digest_size=8).hexdigest()
+
+
+def compile_catalog(csv_path: Path, out_path: Path) -> Path:
+    """Compile the assessments CSV into the binary catalog format."""
+    csv_path, out_path = Path(csv_path), Path(out_path)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        fields = list(reader.fieldnames or [])
+
+    string_cols = [c for c in fields if c != "type"]
+    type_values = [(r.get("type") or "").strip() for r in rows]
+    type_labels = sorted(set(type_values))
+    type_code = np.array([type_labels.index(t) for t in type_values], dtype="<u2")
+
+    sections: List[Tuple[str, bytes, str]] = []
+    for col in string_cols:
+        encoded = [(r.get(col) or "").encode("utf-8") for r in rows]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        off_dtype = "<u4" if offsets[-1] < 2**32 else "<u8"
+        sections.append((f"{col}.offsets", offsets.astype(off_dtype).tobytes(), off_dtype))
+        sections.append((f"{col}.blob", b"".join(encoded), "|u1"))
+    sections.append(("type_code", type_code.tobytes(), "<u2"))
+
+    layout: Dict[str, Dict] = {}
+    pos = 0
+    for name, data, dtype in sections:
+        layout[name] = {"offset": pos, "nbytes": len(data), "dtype": dtype}
+        pos = _align(pos + len(data))
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "catalog_version": catalog_version(csv_path),
+        "n_rows": len(rows),
+        "strings": string_cols,
+        "type_labels": type_labels,
+        "sections": layout,
+    }).encode("utf-8")
+    data_start = _align(len(MAGIC) + 4 + len(header))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name, data, _ in sections:
+            f.seek(data_start + layout[name]["offset"])
+            f.write(data)
+    tmp.replace(out_path)
+    return out_path
+
+
+class Catalog:
+    """Read-only, memory-mapped view over a compiled catalog file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled catalog")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._mm[header_start:header_start + header_len])
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog format {header['format']} in {self.path}")
+
+        self.version: str = header["catalog_version"]
+        self.columns: List[str] = header["strings"] + ["type"]
+        self.type_labels: List[str] = header["type_labels"]
+        self._n: int = header["n_rows"]
+        self._data_start = _align(header_start + header_len)
+        self._sections: Dict[str, Dict] = header["sections"]
+
+        self._offsets = {c: self._array(f"{c}.offsets") for c in header["strings"]}
+        self._blob_start = {
+            c: self._data_start + self._sections[f"{c}.blob"]["offset"] for c in header["strings"]
+        }
+        self.type_code = self._array("type_code")
+
+    def _array(self, name: str) -> np.ndarray:
+        s = self._sections[name]
+        dtype = np.dtype(s["dtype"])
+        return np.frombuffer(
+            self._mm, dtype=dtype, count=s["nbytes"] // dtype.itemsize,
+            offset=self._data_start + s["offset"],
+        )
+
+    def __len__(self) -> int:
+        return self._n
+
+    def get(self, idx: int, column: str) -> str:
+        if column == "type":
+            return self.type_labels[int(self.type_code[idx])]
+        if column not in self._offsets:
+            return ""
+        off = self._offsets[column]
+        start = self._blob_start[column]
+        return self._mm[start + int(off[idx]):start + int(off[idx + 1])].decode("utf-8")
+
+    def column(self, column: str) -> List[str]:
+        return [self.get(i, column) for i in range(self._n)]
+
+    def row(self, idx: int) -> Dict[str, str]:
+        return {c: self.get(idx, c) for c in self.columns}
+
+
+def load_catalog(csv_path: Path, bin_path: Path) -> Catalog:
+    """Memory-map the compiled catalog, recompiling it if the CSV changed.
+
+    The mtime check is only a shortcut: a CSV restored with an older mtime
+    (cp -p, tar, rsync, Docker COPY) is caught by comparing its content
+    hash with the version recorded in the compiled header.
+    """
+    csv_path, bin_path = Path(csv_path), Path(bin_path)
+    if not bin_path.exists() or (
+        csv_path.exists() and csv_path.stat().st_mtime > bin_path.stat().st_mtime
+    ):
+        compile_catalog(csv_path, bin_path)
+        return Catalog(bin_path)
+    catalog = Catalog(bin_path)
+    if csv_path.exists() and catalog.version != catalog_version(csv_path):
+        compile_catalog(csv_path, bin_path)
+        catalog = Catalog(bin_path)
+    return catalog
+
+
+def main():
+    csv_path = Path(sys.argv[1] if len(sys.argv) > 1 else "data/assessments.csv")
+    out_path = Path(sys.argv[2] if len(sys.argv) > 2 else "data/catalog.bin")
+    if not csv_path.exists():
+        raise SystemExit(f"Missing {csv_path}. Run the scraper first.")
+    compile_catalog(csv_path, out_path)
+    cat = Catalog(out_path)
+    print(f"Compiled {len(cat)} assessments to {out_path} "
+          f"({out_path.stat().st_size} bytes, version {cat.version})")
+
+
+if __name__ == "__main__":
+    main()
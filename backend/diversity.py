@@ -0,0 +1,38 @@
+# backend/diversity.py
+
+from typing import List
+
+import numpy as np
+
+
+def mmr_select(relevance: np.ndarray, item_sim: np.ndarray, k: int, lam: float = 0.7) -> List[int]:
+    """
+    Maximal marginal relevance over a candidate set.
+
+    `relevance` holds the candidates' query scores and `item_sim` their
+    pairwise cosine similarities. Each step picks the candidate maximising
+    lam * relevance - (1 - lam) * max similarity to the already selected
+    ones; the running max is updated with one vectorized row operation, so
+    the cost is O(k * n) on top of the single similarity product.
+    Returns positions into the candidate arrays, in selection order.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k == 0:
+        return []
+    # Min-max scale so the trade-off means the same for cosine and cross-encoder scores.
+    rel = np.asarray(relevance, dtype=np.float32)
+    spread = rel.max() - rel.min()
+    rel = (rel - rel.min()) / spread if spread > 0 else np.ones_like(rel)
+
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+    for _ in range(k):
+        penalty = np.where(np.isfinite(max_sim), max_sim, 0.0)
+        score = np.where(available, lam * rel - (1.0 - lam) * penalty, -np.inf)
+        j = int(np.argmax(score))
+        selected.append(j)
+        available[j] = False
+        max_sim = np.maximum(max_sim, item_sim[j])
+    return selected
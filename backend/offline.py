@@ -0,0 +1,89 @@
+# backend/offline.py
+
+"""
+Deterministic, dependency-light test mode.
+
+`HashingEncoder` stands in for SentenceTransformer: it hashes words and
+character trigrams into a fixed-size signed bag-of-features vector, so it
+needs neither torch nor a model download and always produces the same
+embeddings. `offline_recommender()` boots a Recommender on the small
+fixture catalog in `data/fixtures/` with it; the API does the same when
+`SHL_TEST_MODE=1` is set.
+"""
+
+import hashlib
+import re
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+FIXTURE_CSV = "data/fixtures/assessments.csv"
+_TOKEN = re.compile(r"[a-z0-9+#.]+")
+
+
+@lru_cache(maxsize=65536)
+def _feature_slot(feature: str, dim: int):
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, 1.0 if (h >> 63) & 1 else -1.0
+
+
+class HashingEncoder:
+    """Drop-in for the subset of the SentenceTransformer API the repo uses."""
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN.findall(text.lower())
+        feats = list(words)
+        for w in words:
+            padded = f"<{w}>"
+            feats.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return feats
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feat in self._features(text):
+                slot, sign = _feature_slot(feat, self.dim)
+                out[row, slot] += sign
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms > 0, norms, 1.0)
+
+
+def offline_recommender(work_dir: Optional[str] = None, **kwargs):
+    """Recommender over the fixture catalog with the hashing encoder.
+
+    Compiled artifacts are written to `work_dir` so test runs never touch the
+    real data files. Without one, a temporary directory is created; it is
+    owned by the recommender and removed by `close()` (or when the
+    recommender is garbage collected).
+    """
+    from backend.recommender import Recommender
+
+    tmpdir = None
+    if work_dir is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="shl-offline-")
+        work_dir = tmpdir.name
+    work = Path(work_dir)
+    kwargs.setdefault("data_csv", FIXTURE_CSV)
+    try:
+        recommender = Recommender(
+            embeddings_path=str(work / "field_embeddings.npy"),
+            catalog_path=str(work / "catalog.bin"),
+            model_name="offline-hashing",
+            model=HashingEncoder(),
+            **kwargs,
+        )
+    except BaseException:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+        raise
+    recommender.tmpdir = tmpdir
+    return recommender
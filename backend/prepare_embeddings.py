@@ -1,11 +1,13 @@
 from pathlib import Path
 
-import numpy as np
-import pandas as pd
 from sentence_transformers import SentenceTransformer
 
+from backend.catalog import load_catalog
+from backend.recommender import EMBED_FIELDS, encode_fields, save_field_embeddings
+
 DATA_CSV = Path("data/assessments.csv")
-EMB_PATH = Path("data/embeddings.npy")
+CATALOG_PATH = Path("data/catalog.bin")
+EMB_PATH = Path("data/field_embeddings.npy")
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
 
@@ -13,18 +15,14 @@ def main():
     if not DATA_CSV.exists():
         raise SystemExit(f"Missing {DATA_CSV}. Run the scraper first.")
 
-    df = pd.read_csv(DATA_CSV)
-    texts = df["description"].fillna("").astype(str).tolist()
+    catalog = load_catalog(DATA_CSV, CATALOG_PATH)
 
     model = SentenceTransformer(MODEL_NAME)
-    embs = model.encode(texts, batch_size=64, show_progress_bar=True)
-    embs = np.asarray(embs, dtype=np.float32)
+    embs, present = encode_fields(model, catalog)
 
-    EMB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    np.save(EMB_PATH, embs)
-    print(f"Saved embeddings to {EMB_PATH} with shape {embs.shape}")
+    save_field_embeddings(EMB_PATH, embs, present, catalog)
+    print(f"Saved {', '.join(EMBED_FIELDS)} embeddings to {EMB_PATH} with shape {embs.shape}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,71 @@
+# backend/query.py
+
+"""
+Query preprocessing for long job descriptions.
+
+MiniLM silently truncates its input, and encoding cost grows with text
+length, so long texts are trimmed to their salient sections, capped at a
+token budget, and split into overlapping chunks that are encoded in one
+batch. Tokens are approximated by whitespace-separated words.
+"""
+
+import re
+from typing import List
+
+# Section headings whose body rarely says anything about the skills to assess.
+# The whole heading must match, so job titles such as "Privacy Engineer" or
+# "Compensation Analyst" are not mistaken for boilerplate.
+_BOILERPLATE = (
+    r"about (us|the company)|who we are|our (story|culture|mission|values)|"
+    r"benefits|perks|what we offer|why (join us|work with us|join|work here)|compensation|salary|pay range|"
+    r"equal (employment )?opportunit(y|ies)( employer)?|eeo( statement)?|diversity|inclusion|"
+    r"how to apply|application process|disclaimer|privacy( notice| policy)?"
+)
+BOILERPLATE_HEADING = re.compile(
+    rf"^({_BOILERPLATE})(\s*(&|and|/|,)\s*({_BOILERPLATE}))*\s*[:?]?$",
+    re.I,
+)
+
+
+def _is_heading(line: str) -> bool:
+    words = line.split()
+    return 0 < len(words) <= 8 and (line.endswith(":") or line.isupper() or line.startswith("#")
+                                    or bool(BOILERPLATE_HEADING.match(line)))
+
+
+def extract_salient(text: str) -> str:
+    """Drop boilerplate sections (company blurb, benefits, EEO statements).
+
+    The first line is always kept: it is usually the job title.
+    """
+    kept: List[str] = []
+    skipping = False
+    for raw in text.splitlines():
+        line = raw.strip().strip("*").strip()
+        if not line:
+            continue
+        if kept and _is_heading(line):
+            skipping = bool(BOILERPLATE_HEADING.match(line.lstrip("#").strip()))
+            if skipping:
+                continue
+        if not skipping:
+            kept.append(line)
+    # Never strip a text down to nothing because of an over-eager heading match.
+    return " ".join(kept) if kept else " ".join(text.split())
+
+
+def chunk_query(
+    text: str, chunk_tokens: int = 128, max_tokens: int = 512, overlap: int = 16
+) -> List[str]:
+    """Split a query into overlapping chunks covering at most `max_tokens` words."""
+    words = text.split()
+    if len(words) <= chunk_tokens:
+        return [" ".join(words)]
+    words = extract_salient(text).split()[:max_tokens]
+    stride = max(1, chunk_tokens - overlap)
+    chunks = []
+    for start in range(0, len(words), stride):
+        chunks.append(" ".join(words[start:start + chunk_tokens]))
+        if start + chunk_tokens >= len(words):
+            break
+    return chunks
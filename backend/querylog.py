@@ -0,0 +1,155 @@
+# backend/querylog.py
+
+"""
+Asynchronous query log for offline performance analysis.
+
+The request path only samples a record and drops it on a bounded queue; a
+background thread redacts PII, batches records and appends them as gzip
+members to rotated `querylog-*.jsonl.gz` files. If the queue is full the
+record is dropped and counted rather than slowing the request down.
+`read_query_logs()` streams the records back for `replay_queries.py`.
+"""
+
+import gzip
+import json
+import queue
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+# Phone-style digit groups: optional +country code and (area) code, then 2-5
+# digit groups joined by single separators. Matches must hold at least
+# `_PHONE_MIN_DIGITS` digits and are not all years, so salary ranges
+# ("100000 - 120000"), dates ("12.5.2024", "12.05.2024-31.12.2025") and
+# year ranges ("2019-2023") are left alone.
+_PHONE = re.compile(
+    r"(?<![\w.])(\+\d{1,3}[ .-]?)?(\(\d{1,5}\)[ .-]?)?\d{2,5}([ .-]\d{2,5}){1,5}(?!\w|[.-]\d)"
+    r"|(?<![\w.])\+\d{8,15}(?!\w|[.-]\d)"
+)
+_PHONE_MIN_DIGITS = 9
+_YEAR = re.compile(r"(19|20)\d\d")
+_DATE = re.compile(r"(?<!\d)\d{1,2}([./-])\d{1,2}\1(19|20)\d\d(?!\d)")
+_STOP = object()
+REDACTION_MARKERS = ("<email>", "<phone>")
+
+
+def _phone_or_keep(m: "re.Match") -> str:
+    groups = re.findall(r"\d+", m.group())
+    if (sum(map(len, groups)) < _PHONE_MIN_DIGITS or all(_YEAR.fullmatch(g) for g in groups)
+            or _DATE.search(m.group())):
+        return m.group()
+    return "<phone>"
+
+
+def redact(text: str) -> str:
+    """Mask e-mail addresses and phone numbers."""
+    return _PHONE.sub(_phone_or_keep, _EMAIL.sub("<email>", text))
+
+
+def is_redacted(text: str) -> bool:
+    """True if `redact` changed the text, so it no longer matches what was served."""
+    return any(m in text for m in REDACTION_MARKERS)
+
+
+class QueryLogWriter:
+    def __init__(
+        self,
+        directory: Path,
+        sample_rate: float = 1.0,
+        redact_pii: bool = True,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: float = 3600.0,
+        max_queue: int = 10000,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.redact_pii = redact_pii
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.written = 0
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._path: Optional[Path] = None
+        self._opened_at = 0.0
+        self._seq = 0
+        self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, record: Dict) -> bool:
+        """Queue a record without blocking; returns False if sampled out or dropped."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _current_file(self) -> Path:
+        now = time.time()
+        if (self._path is None or now - self._opened_at > self.max_age
+                or (self._path.exists() and self._path.stat().st_size > self.max_bytes)):
+            self._seq += 1
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now))
+            self._path = self.directory / f"querylog-{stamp}-{self._seq:04d}.jsonl.gz"
+            self._opened_at = now
+        return self._path
+
+    def _write(self, batch: List[Dict]) -> None:
+        lines = []
+        for record in batch:
+            if self.redact_pii and "query" in record:
+                record = {**record, "query": redact(record["query"])}
+            lines.append(json.dumps(record, ensure_ascii=False))
+        # Each batch is a complete gzip member, so files stay readable while growing.
+        with gzip.open(self._current_file(), "at", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self.written += len(batch)
+
+    def _run(self) -> None:
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            stop = item is _STOP
+            if item is not None and not stop:
+                batch.append(item)
+            if batch and (stop or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    self._write(batch)
+                except OSError:
+                    self.dropped += len(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if stop:
+                return
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+def read_query_logs(paths: Iterable[Path]) -> Iterator[Dict]:
+    """Yield records from log files and/or directories of them, oldest file first."""
+    files: List[Path] = []
+    for p in map(Path, paths):
+        files.extend(sorted(p.glob("querylog-*.jsonl.gz")) if p.is_dir() else [p])
+    for path in files:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -2,63 +2,217 @@
 
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
-from sentence_transformers import SentenceTransformer
+
+from backend.cache import SemanticCache
+from backend.catalog import Catalog, load_catalog
+from backend.diversity import mmr_select
+from backend.query import chunk_query
+from backend.reranker import CrossEncoderReranker
+from backend.sharding import ShardedIndex
+
+# Catalog fields embedded separately and fused at query time. "details" is
+# optional scraped long-form text; fields no item has are dropped from the
+# fusion and the remaining weights renormalized.
+EMBED_FIELDS = ("name", "description", "type", "details")
+DEFAULT_FIELD_WEIGHTS = {"name": 0.3, "description": 0.5, "type": 0.1, "details": 0.1}
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def present_fields(catalog: Catalog) -> List[str]:
+    """The embedded fields at least one catalog item has a value for."""
+    return [f for f in EMBED_FIELDS if any(catalog.get(i, f).strip() for i in range(len(catalog)))]
+
+
+def effective_field_weights(weights: Dict[str, float], present: List[str]) -> Dict[str, float]:
+    """Drop weights of absent fields and renormalize the rest to sum to 1."""
+    w = {f: float(weights.get(f, 0.0)) for f in EMBED_FIELDS if f in present and weights.get(f)}
+    total = sum(w.values())
+    if total <= 0:
+        # An all-zero fused matrix would silently rank in catalog order.
+        raise ValueError(f"No positive weight for any catalog field present ({', '.join(present)}): {weights}")
+    return {f: x / total for f, x in w.items()}
+
+
+def ranking_fingerprint(
+    model_name: str,
+    field_weights: Dict[str, float],
+    chunk_tokens: int = 128,
+    max_query_tokens: int = 512,
+    chunk_pooling: str = "max",
+    rerank_model: Optional[str] = None,
+) -> str:
+    """Identifies everything besides the catalog that affects rankings.
+
+    Defaults mirror Recommender's, so the fingerprint of a configuration can
+    be computed before its model has loaded.
+    """
+    parts = [model_name, json.dumps(field_weights, sort_keys=True),
+             f"chunks={chunk_tokens}/{max_query_tokens}/{chunk_pooling}"]
+    if rerank_model is not None:
+        parts.append(f"rerank={rerank_model}")
+    return "|".join(parts)
+
+
+def encode_fields(model, catalog: Catalog, batch_size: int = 64) -> Tuple[np.ndarray, List[str]]:
+    """Encode every field of every item in one batched pass.
+
+    Only distinct non-empty texts are encoded (e.g. each type label once).
+    Returns a (n_fields, n_items, dim) float32 array of unit vectors, with
+    zeros for empty field values, and the fields at least one item has.
+    """
+    texts = [catalog.get(i, f).strip() for f in EMBED_FIELDS for i in range(len(catalog))]
+    unique = sorted({t for t in texts if t})
+    dim = model.get_sentence_embedding_dimension()
+    flat = np.zeros((len(texts), dim), dtype=np.float32)
+    if unique:
+        embs = np.asarray(model.encode(unique, batch_size=batch_size, show_progress_bar=True), dtype=np.float32)
+        embs /= np.linalg.norm(embs, axis=1, keepdims=True) + 1e-12
+        slot = {t: k for k, t in enumerate(unique)}
+        rows = [j for j, t in enumerate(texts) if t]
+        flat[rows] = embs[[slot[texts[j]] for j in rows]]
+    return flat.reshape(len(EMBED_FIELDS), len(catalog), dim), present_fields(catalog)
+
+
+def _meta_path(path: Path) -> Path:
+    return Path(path).with_suffix(".json")
+
+
+def save_field_embeddings(path: Path, embs: np.ndarray, present: List[str], catalog: Catalog) -> None:
+    """Write the tensor as a plain .npy (so it can be memory-mapped) plus a JSON sidecar."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, embs)
+    _meta_path(path).write_text(json.dumps({
+        "fields": list(EMBED_FIELDS), "present": present, "catalog_version": catalog.version,
+    }))
+
+
+def format_assessment(catalog: Catalog, idx: int) -> Dict:
+    row = catalog.row(idx)
+    test_type_str = row.get("type", "Knowledge & Skills")
+    test_types = [test_type_str] if test_type_str else ["Knowledge & Skills"]
+    return {
+        "url": row.get("url", ""), "name": row.get("name", ""),
+        "adaptive_support": "No", "description": row.get("description", ""),
+        "duration": 60, "remote_support": "Yes",
+        "test_type": test_types,
+    }
+
 
 class Recommender:
-    def _init_(
+    def __init__(
         self,
         data_csv: str = "data/assessments.csv",
-        embeddings_path: str = "data/embeddings.npy",
-        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        embeddings_path: str = "data/field_embeddings.npy",
+        model_name: str = DEFAULT_MODEL_NAME,
+        catalog_path: str = "data/catalog.bin",
+        field_weights: Optional[Dict[str, float]] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        chunk_tokens: int = 128,
+        max_query_tokens: int = 512,
+        chunk_pooling: str = "max",
+        shards: int = 0,
+        model=None,
+        semantic_cache_threshold: Optional[float] = None,
+        semantic_cache_size: int = 1024,
     ) -> None:
         # --- START OF THE FIX ---
-        # The model must be initialized FIRST.
+        # The model must be initialized FIRST. Any object with the
+        # SentenceTransformer encode() API can be injected (see backend.offline).
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+        self.model = model
 
         # THEN, we define and use the absolute paths.
-        BASE_PATH = Path(_file_).resolve().parent.parent
+        BASE_PATH = Path(__file__).resolve().parent.parent
         self.data_csv = BASE_PATH / data_csv
         self.embeddings_path = BASE_PATH / embeddings_path
+        self.catalog_path = BASE_PATH / catalog_path
         # --- END OF THE FIX ---
         
-        self.df = pd.read_csv(self.data_csv)
-        self._ensure_type_column()
-        self.embeddings = self._load_or_build_embeddings()
-        self.embeddings = self._normalize(self.embeddings)
+        # The catalog is memory-mapped from its compiled binary form, so the
+        # serving path never needs pandas.
+        self.catalog = load_catalog(self.data_csv, self.catalog_path)
+        self.present_fields, self.field_embeddings = self._load_or_build_embeddings()
+        self.fields = list(EMBED_FIELDS)
+        self.set_field_weights(field_weights or DEFAULT_FIELD_WEIGHTS)
+        # Optional second stage over the over-fetched candidates.
+        self.reranker = reranker
+        # Long job descriptions are chunked and the chunk scores pooled.
+        if chunk_pooling not in ("max", "mean"):
+            raise ValueError(f"chunk_pooling must be 'max' or 'mean', got {chunk_pooling!r}")
+        self.chunk_tokens = chunk_tokens
+        self.max_query_tokens = max_query_tokens
+        self.chunk_pooling = chunk_pooling
+        # For very large catalogs the scan can be split across processes.
+        # The catalog itself is rebuilt from CSV, so growth is not incremental
+        # here: ShardedIndex.append() is only reachable when driving the index
+        # directly, and a Recommender picks up new items on restart.
+        self.index = ShardedIndex(self.embeddings, shards) if shards > 1 else None
+        # Scratch directory owning the compiled artifacts, if any (see backend.offline).
+        self.tmpdir = None
+        # Paraphrased queries above the similarity threshold reuse earlier rankings.
+        self.cache = None
+        if semantic_cache_threshold is not None:
+            self.cache = SemanticCache(
+                self.embeddings.shape[1], capacity=semantic_cache_size, threshold=semantic_cache_threshold,
+            )
         self.proto = {
             "Knowledge & Skills": self._embed_text("technical knowledge and skills assessment for job candidates"),
             "Personality & Behavior": self._embed_text("personality and behavioral assessment for job candidates"),
         }
 
-    # ... The rest of the file is correct and can remain the same ...
-    def _ensure_type_column(self) -> None:
-        if "type" not in self.df.columns: self.df["type"] = ""
-        self.df["type"] = self.df["type"].fillna("")
-
-    def _load_or_build_embeddings(self) -> np.ndarray:
-        p = Path(self.embeddings_path)
-        if p.exists(): return np.load(p)
+    def _load_or_build_embeddings(self) -> Tuple[List[str], np.ndarray]:
+        p, meta_path = Path(self.embeddings_path), _meta_path(self.embeddings_path)
+        if p.exists() and meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta["catalog_version"] == self.catalog.version and tuple(meta["fields"]) == EMBED_FIELDS:
+                # Memory-mapped: only the fused matrix is held in RAM.
+                return meta["present"], np.load(p, mmap_mode="r")
         return self._build_and_save_embeddings()
 
-    def _build_and_save_embeddings(self) -> np.ndarray:
-        texts: List[str] = self.df["description"].fillna("").astype(str).tolist()
+    def _build_and_save_embeddings(self) -> Tuple[List[str], np.ndarray]:
         # This line uses self.model, so it must be initialized before this is called.
-        embs = self.model.encode(texts, batch_size=64, show_progress_bar=True)
-        embs = np.array(embs, dtype=np.float32)
-        Path(self.embeddings_path).parent.mkdir(parents=True, exist_ok=True)
-        np.save(self.embeddings_path, embs)
-        return embs
+        embs, present = encode_fields(self.model, self.catalog)
+        save_field_embeddings(self.embeddings_path, embs, present, self.catalog)
+        del embs
+        return present, np.load(self.embeddings_path, mmap_mode="r")
+
+    def set_field_weights(self, weights: Dict[str, float]) -> None:
+        """Fuse the per-field matrices into one (n_items, dim) scoring matrix.
+
+        Scoring is linear in the field embeddings, so sum_f w_f * (E_f @ q) is
+        precomputed as (sum_f w_f * E_f) @ q and each query costs one product.
+        Weights of fields absent from the catalog are dropped and the rest
+        renormalized to sum to 1.
+        """
+        unknown = set(weights) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown embedding fields: {sorted(unknown)}")
+        self.field_weights = effective_field_weights(weights, self.present_fields)
+        w = np.array([self.field_weights.get(f, 0.0) for f in self.fields], dtype=np.float32)
+        used = np.flatnonzero(w)
+        self.embeddings = np.tensordot(w[used], np.asarray(self.field_embeddings[used]), axes=1)
+        if getattr(self, "index", None) is not None:
+            self.index.reset(self.embeddings)
+        # Cached rankings were computed with the old weights.
+        if getattr(self, "cache", None) is not None:
+            self.cache.clear()
 
     def _embed_text(self, text: str) -> np.ndarray:
         v = self.model.encode([text])
         v = np.array(v, dtype=np.float32)[0]
         return self._normalize(v)
 
+    def _embed_query(self, query: str) -> np.ndarray:
+        chunks = chunk_query(query, self.chunk_tokens, self.max_query_tokens)
+        v = self.model.encode(chunks, batch_size=len(chunks))
+        return self._normalize(np.array(v, dtype=np.float32))
+
     def _normalize(self, x: np.ndarray) -> np.ndarray:
         if x.ndim == 1:
             denom = np.linalg.norm(x) + 1e-12
@@ -70,24 +224,63 @@ class Recommender:
         return b @ a
 
     def search(self, query: str, top_n: int = 20) -> List[Tuple[int, float]]:
-        q = self._embed_text(query)
-        sims = self._cosine_sim(q, self.embeddings)
+        return self._search_vectors(self._embed_query(query), top_n)
+
+    def _search_vectors(self, q: np.ndarray, top_n: int) -> List[Tuple[int, float]]:
+        if self.index is not None:
+            return self.index.search(q, top_n, self.chunk_pooling)
+        sims = self._cosine_sim(q.T, self.embeddings)
+        sims = sims.max(axis=1) if self.chunk_pooling == "max" else sims.mean(axis=1)
         idx = np.argpartition(-sims, kth=min(top_n, len(sims) - 1))[:top_n]
         idx = idx[np.argsort(sims[idx])[::-1]]
         return [(int(i), float(sims[i])) for i in idx]
 
-    def recommend(self, query: str, top_k: int = 10) -> List[Dict]:
-        cands = self.search(query, top_n=max(20, top_k * 2))
-        final = cands[:top_k]
-        results: List[Dict] = []
-        for idx, score in final:
-            row = self.df.iloc[idx].to_dict()
-            test_type_str = row.get("type", "Knowledge & Skills")
-            test_types = [test_type_str] if test_type_str else ["Knowledge & Skills"]
-            results.append({
-                "url": row.get("url", ""), "name": row.get("name", ""),
-                "adaptive_support": "No", "description": row.get("description", ""),
-                "duration": 60, "remote_support": "Yes",
-                "test_type": test_types,
-            })
-        return results
+    def close(self) -> None:
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        if self.tmpdir is not None:
+            self.tmpdir.cleanup()
+            self.tmpdir = None
+
+    def _rerank_text(self, idx: int) -> str:
+        return f"{self.catalog.get(idx, 'name')}. {self.catalog.get(idx, 'description')}"
+
+    def fingerprint(self) -> str:
+        """Identifies everything besides the catalog that affects rankings."""
+        return ranking_fingerprint(
+            self.model_name, self.field_weights, self.chunk_tokens, self.max_query_tokens, self.chunk_pooling,
+            self.reranker.model_name if self.reranker is not None else None,
+        )
+
+    def _diversify(self, cands: List[Tuple[int, float]], top_k: int, mmr_lambda: float) -> List[Tuple[int, float]]:
+        idx = np.array([i for i, _ in cands])
+        items = self._normalize(self.embeddings[idx])
+        picks = mmr_select(np.array([s for _, s in cands]), items @ items.T, top_k, mmr_lambda)
+        return [cands[p] for p in picks]
+
+    def rank(
+        self, query: str, top_k: int = 10, use_cache: bool = True, mmr_lambda: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        q = self._embed_query(query)
+        use_cache = use_cache and self.cache is not None
+        params = (top_k, mmr_lambda)
+        if use_cache:
+            key = self._normalize(q.mean(axis=0))
+            hit = self.cache.get(key, params=params)
+            if hit is not None:
+                return hit
+        cands = self._search_vectors(q, top_n=max(20, top_k * 2))
+        if self.reranker is not None:
+            cands = self.reranker.rerank(query, cands, self._rerank_text)
+        if mmr_lambda is not None:
+            # Trade relevance for variety among the over-fetched candidates.
+            final = self._diversify(cands, top_k, mmr_lambda)
+        else:
+            final = cands[:top_k]
+        if use_cache:
+            self.cache.put(key, final, params=params)
+        return final
+
+    def recommend(self, query: str, top_k: int = 10, mmr_lambda: Optional[float] = None) -> List[Dict]:
+        return [format_assessment(self.catalog, idx) for idx, _ in self.rank(query, top_k, mmr_lambda=mmr_lambda)]
@@ -0,0 +1,83 @@
+# backend/reranker.py
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker:
+    """
+    Second-stage scorer for the bi-encoder's over-fetched candidates.
+
+    All uncached (query, item) pairs are scored in one batched forward pass.
+    If that pass is predicted to exceed `budget_ms`, or actually does, the
+    bi-encoder order is returned unchanged; scores that were computed are
+    still cached so a repeated query is served from the cache next time.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        budget_ms: Optional[float] = 150.0,
+        cache_size: int = 20000,
+        model=None,
+    ) -> None:
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            model = CrossEncoder(model_name)
+        self.model = model
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self._ms_per_pair: Optional[float] = None
+        self.stats: Dict[str, int] = {"calls": 0, "cache_hits": 0, "skipped": 0, "fallbacks": 0}
+
+    def _over_budget(self, ms: float) -> bool:
+        return self.budget_ms is not None and ms > self.budget_ms
+
+    def _score_pairs(self, query: str, idxs: List[int], text_for: Callable[[int], str]) -> float:
+        start = time.perf_counter()
+        pairs = [(query, text_for(i)) for i in idxs]
+        scores = np.asarray(self.model.predict(pairs, batch_size=len(pairs)), dtype=np.float32)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        per_pair = elapsed_ms / len(pairs)
+        self._ms_per_pair = per_pair if self._ms_per_pair is None else 0.8 * self._ms_per_pair + 0.2 * per_pair
+        for i, s in zip(idxs, scores):
+            self._cache[(query, i)] = float(s)
+        return elapsed_ms
+
+    def _evict(self) -> None:
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def rerank(
+        self, query: str, cands: List[Tuple[int, float]], text_for: Callable[[int], str]
+    ) -> List[Tuple[int, float]]:
+        self.stats["calls"] += 1
+        missing = [i for i, _ in cands if (query, i) not in self._cache]
+        self.stats["cache_hits"] += len(cands) - len(missing)
+
+        if missing:
+            if self._ms_per_pair is not None and self._over_budget(self._ms_per_pair * len(missing)):
+                # Decay the estimate so a one-off slow pass (e.g. warm-up)
+                # does not disable re-ranking for good.
+                self._ms_per_pair *= 0.9
+                self.stats["skipped"] += 1
+                return cands
+            if self._over_budget(self._score_pairs(query, missing, text_for)):
+                self._evict()
+                self.stats["fallbacks"] += 1
+                return cands
+
+        for i, _ in cands:
+            self._cache.move_to_end((query, i))
+        scored = [(i, self._cache[(query, i)]) for i, _ in cands]
+        # Evict only after reading, so this query's own candidates survive.
+        self._evict()
+        return sorted(scored, key=lambda x: x[1], reverse=True)
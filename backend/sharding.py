@@ -0,0 +1,155 @@
+# backend/sharding.py
+
+"""
+Sharded catalog search across worker processes.
+
+The fused catalog matrix is partitioned across worker processes, each
+holding its own shard and the global row ids it covers. A query is fanned
+out to every shard, each shard returns its local top-n, and the coordinator
+merges the already-sorted shard results with a heap.
+"""
+
+import heapq
+import itertools
+import math
+import multiprocessing as mp
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def _pooled_scores(matrix: np.ndarray, q: np.ndarray, pooling: str) -> np.ndarray:
+    sims = matrix @ q.T
+    return sims.max(axis=1) if pooling == "max" else sims.mean(axis=1)
+
+
+def _shard_worker(conn, ids: np.ndarray, matrix: np.ndarray) -> None:
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        op = msg[0]
+        if op == "search":
+            _, q, top_n, pooling = msg
+            if len(ids) == 0:
+                conn.send([])
+                continue
+            sims = _pooled_scores(matrix, q, pooling)
+            k = min(top_n, len(sims))
+            idx = np.argpartition(-sims, kth=k - 1)[:k]
+            idx = idx[np.argsort(sims[idx])[::-1]]
+            conn.send([(float(sims[i]), int(ids[i])) for i in idx])
+        elif op == "append":
+            _, new_ids, new_rows = msg
+            ids = np.concatenate([ids, new_ids])
+            matrix = np.vstack([matrix, new_rows])
+            conn.send(len(ids))
+        elif op == "reset":
+            _, ids, matrix = msg
+            conn.send(len(ids))
+    conn.close()
+
+
+class ShardedIndex:
+    """
+    Coordinator for a fixed pool of shard worker processes.
+
+    New rows go to the smallest shard. When the largest shard exceeds
+    `max_imbalance` times the mean shard size (or `max_shard_rows`, which
+    also adds shards), the catalog is repartitioned evenly. Recommender does
+    not call `append()`; it rebuilds the index from the compiled catalog.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        n_shards: int,
+        max_imbalance: float = 1.25,
+        max_shard_rows: Optional[int] = None,
+    ) -> None:
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.Lock()
+        self._workers: List[Tuple[mp.Process, object]] = []
+        self._sizes: List[int] = []
+        self.max_imbalance = max_imbalance
+        self.max_shard_rows = max_shard_rows
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self._partition(max(1, n_shards))
+
+    @property
+    def n_shards(self) -> int:
+        return len(self._workers)
+
+    @property
+    def shard_sizes(self) -> List[int]:
+        return list(self._sizes)
+
+    def _spawn(self, ids: np.ndarray, matrix: np.ndarray) -> None:
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_shard_worker, args=(child, ids, matrix), daemon=True)
+        proc.start()
+        child.close()
+        self._workers.append((proc, parent))
+
+    def _partition(self, n_shards: int) -> None:
+        n = len(self.embeddings)
+        if self.max_shard_rows:
+            n_shards = max(n_shards, math.ceil(n / self.max_shard_rows))
+        bounds = np.linspace(0, n, n_shards + 1).astype(int)
+        self._sizes = []
+        for s in range(n_shards):
+            lo, hi = int(bounds[s]), int(bounds[s + 1])
+            ids = np.arange(lo, hi, dtype=np.int64)
+            matrix = self.embeddings[lo:hi]
+            if s < len(self._workers):
+                self._workers[s][1].send(("reset", ids, matrix))
+                self._workers[s][1].recv()
+            else:
+                self._spawn(ids, matrix)
+            self._sizes.append(hi - lo)
+
+    def _needs_rebalance(self) -> bool:
+        mean = sum(self._sizes) / len(self._sizes)
+        if self.max_shard_rows and max(self._sizes) > self.max_shard_rows:
+            return True
+        return mean > 0 and max(self._sizes) > self.max_imbalance * mean
+
+    def reset(self, embeddings: np.ndarray) -> None:
+        """Replace the whole catalog matrix, e.g. after a field weight change."""
+        with self._lock:
+            self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            self._partition(self.n_shards)
+
+    def append(self, rows: np.ndarray) -> None:
+        """Add catalog rows, rebalancing the shards if they drift apart."""
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        with self._lock:
+            start = len(self.embeddings)
+            self.embeddings = np.vstack([self.embeddings, rows])
+            s = int(np.argmin(self._sizes))
+            self._workers[s][1].send(("append", np.arange(start, start + len(rows), dtype=np.int64), rows))
+            self._sizes[s] = self._workers[s][1].recv()
+            if self._needs_rebalance():
+                self._partition(self.n_shards)
+
+    def search(self, q: np.ndarray, top_n: int = 20, pooling: str = "max") -> List[Tuple[int, float]]:
+        q = np.atleast_2d(np.asarray(q, dtype=np.float32))
+        with self._lock:
+            for _, conn in self._workers:
+                conn.send(("search", q, top_n, pooling))
+            shard_results = [conn.recv() for _, conn in self._workers]
+        # Each shard list is sorted by descending score; merge them lazily.
+        merged = heapq.merge(*shard_results, key=lambda x: x[0], reverse=True)
+        return [(i, s) for s, i in itertools.islice(merged, top_n)]
+
+    def close(self) -> None:
+        with self._lock:
+            for proc, conn in self._workers:
+                try:
+                    conn.send(None)
+                    conn.close()
+                except (BrokenPipeError, OSError):
+                    pass
+                proc.join(timeout=5)
+            self._workers = []
@@ -0,0 +1,65 @@
+"""
+Benchmark sharded catalog search against the single-process scan.
+
+Uses a synthetic catalog so it runs without the model:
+    python benchmark_sharding.py --rows 500000 --shards 1 2 4 8
+BLAS is pinned to one thread per process so the numbers reflect
+process-level scaling rather than BLAS threading.
+"""
+import os
+
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, "1")
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.sharding import ShardedIndex
+
+
+def single_process_search(embeddings, q, top_n):
+    sims = (embeddings @ q.T).max(axis=1)
+    idx = np.argpartition(-sims, kth=top_n - 1)[:top_n]
+    return idx[np.argsort(sims[idx])[::-1]]
+
+
+def timed(fn, queries):
+    fn(queries[0])  # warm-up
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(queries) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.rows, args.dim), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    queries = [rng.standard_normal((1, args.dim), dtype=np.float32) for _ in range(args.queries)]
+
+    print(f"Catalog: {args.rows} x {args.dim}, {args.queries} queries, top-{args.top_n}")
+    base_ms = timed(lambda q: single_process_search(embeddings, q, args.top_n), queries)
+    print(f"{'in-process':>12}: {base_ms:8.2f} ms/query")
+
+    for n in sorted(set(args.shards)):
+        index = ShardedIndex(embeddings, n)
+        try:
+            ms = timed(lambda q: index.search(q, args.top_n), queries)
+        finally:
+            index.close()
+        print(f"{n:>5} shards: {ms:8.2f} ms/query  (x{base_ms / ms:.2f} vs in-process)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,17 @@ set -o errexit
 echo "--- Installing dependencies ---"
 pip install -r requirements.txt
 
-# 2. (Optional but Recommended) Run the script that builds the embeddings
-# This pre-builds the .npy file so your app starts faster.
+# 2. Compile the catalog CSV into the memory-mapped binary the API serves from
+echo "--- Compiling assessment catalog ---"
+python -m backend.catalog
+
+# 3. (Optional but Recommended) Run the script that builds the embeddings
+# This encodes the per-field embeddings (data/field_embeddings.npy + .json) so your app starts faster.
 echo "--- Pre-building sentence embeddings ---"
 python -c "from backend.recommender import Recommender; Recommender()"
 
+# 4. Precompute answers for popular queries so they are served while the model loads
+echo "--- Precomputing popular-query answers ---"
+python -m backend.answers
+
 echo "--- Build finished ---"
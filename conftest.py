@@ -0,0 +1,26 @@
+"""
+Shared pytest fixtures.
+
+`client` boots the API in SHL_TEST_MODE (fixture catalog + hashing encoder)
+and waits for the background model load. Override `app_env` in a test
+module to set extra environment variables before the app starts.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app, model_storage
+
+
+@pytest.fixture
+def app_env():
+    return {}
+
+
+@pytest.fixture
+def client(monkeypatch, app_env):
+    monkeypatch.setenv("SHL_TEST_MODE", "1")
+    for name, value in app_env.items():
+        monkeypatch.setenv(name, value)
+    with TestClient(app) as c:
+        assert model_storage["ready"].wait(10)
+        yield c
@@ -1,6 +1,11 @@
+import argparse
+import random
+import re
+import time
 import pandas as pd
 from pathlib import Path
 from backend.recommender import Recommender
+from backend.reranker import DEFAULT_RERANK_MODEL, CrossEncoderReranker
 from collections import defaultdict
 
 def calculate_recall_at_k(recommended_urls, relevant_urls, k=10):
@@ -15,7 +20,17 @@ def calculate_recall_at_k(recommended_urls, relevant_urls, k=10):
     recall = hits / len(relevant_set)
     return recall
 
-def evaluate_on_dataset(recommender, data_csv, k=10):
+def paraphrase(query, seed=0):
+    """Near-duplicate of a query: reordered sentences, extra whitespace and boilerplate."""
+    rng = random.Random(f"{seed}:{query}")
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", query) if s]
+    rng.shuffle(sentences)
+    text = "  ".join(sentences)
+    if rng.random() < 0.5:
+        text = "Hi,  " + text + "\nThanks!"
+    return text
+
+def evaluate_on_dataset(recommender, data_csv, k=10, transform=None, mmr_lambda=None):
     """Evaluate recommender on labeled dataset"""
     df = pd.read_csv(data_csv)
     
@@ -31,9 +46,12 @@ def evaluate_on_dataset(recommender, data_csv, k=10):
     print("=" * 80)
     
     recalls = []
+    latencies = []
     for i, (query, relevant_urls) in enumerate(query_to_relevant.items(), 1):
         # Get recommendations
-        results = recommender.recommend(query, top_k=k)
+        start = time.perf_counter()
+        results = recommender.recommend(transform(query) if transform else query, top_k=k, mmr_lambda=mmr_lambda)
+        latencies.append((time.perf_counter() - start) * 1000.0)
         recommended_urls = [r['url'] for r in results]
         
         # Calculate recall
@@ -61,13 +79,39 @@ def evaluate_on_dataset(recommender, data_csv, k=10):
     print(f"MEAN RECALL@{k}: {mean_recall:.4f}")
     print(f"Best Recall: {max(recalls):.4f}")
     print(f"Worst Recall: {min(recalls):.4f}")
+    if latencies:
+        latencies.sort()
+        print(f"Latency p50: {latencies[len(latencies) // 2]:.1f} ms, "
+              f"max: {latencies[-1]:.1f} ms")
+    if recommender.reranker is not None:
+        print(f"Re-ranker stats: {recommender.reranker.stats}")
+    if recommender.cache is not None:
+        print(f"Semantic cache stats: {recommender.cache.stats()}")
     print("=" * 80)
     
     return mean_recall, recalls
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate Recall@K on the labeled dataset")
+    parser.add_argument("--rerank", action="store_true", help="Re-rank candidates with a cross-encoder")
+    parser.add_argument("--rerank-model", default=DEFAULT_RERANK_MODEL)
+    parser.add_argument("--rerank-budget-ms", type=float, default=None,
+                        help="Fall back to bi-encoder order above this latency (default: unlimited)")
+    parser.add_argument("--semantic-cache", type=float, default=None, metavar="THRESHOLD",
+                        help="Enable the semantic query cache at this cosine similarity")
+    parser.add_argument("--mmr-lambda", type=float, default=None,
+                        help="Diversify the top-k with MMR (1.0 = pure relevance)")
+    parser.add_argument("--paraphrases", action="store_true",
+                        help="Also evaluate near-duplicate rewrites of every query (after the originals)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("Loading recommender model...")
-    recommender = Recommender()
+    reranker = None
+    if args.rerank:
+        reranker = CrossEncoderReranker(args.rerank_model, budget_ms=args.rerank_budget_ms)
+    recommender = Recommender(reranker=reranker, semantic_cache_threshold=args.semantic_cache)
     
     # Evaluate on train+test data
     train_test_csv = Path("data/train_test_data.csv")
@@ -75,7 +119,16 @@ def main():
         print(f"\n{'=' * 80}")
         print("EVALUATING ON FULL DATASET (Train + Test)")
         print('=' * 80)
-        mean_recall, recalls = evaluate_on_dataset(recommender, train_test_csv, k=10)
+        mean_recall, recalls = evaluate_on_dataset(recommender, train_test_csv, k=10, mmr_lambda=args.mmr_lambda)
+        if args.paraphrases:
+            # With --semantic-cache these are served from the originals' cached
+            # rankings; compare against a run without it to see the recall impact.
+            print(f"\n{'=' * 80}")
+            print("EVALUATING ON PARAPHRASED QUERIES")
+            print('=' * 80)
+            para_recall, _ = evaluate_on_dataset(
+                recommender, train_test_csv, k=10, transform=paraphrase, mmr_lambda=args.mmr_lambda)
+            print(f"\nRecall@10 original: {mean_recall:.4f}  paraphrased: {para_recall:.4f}")
     else:
         print(f"Dataset not found at {train_test_csv}")
 
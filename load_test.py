@@ -0,0 +1,258 @@
+"""
+Open-loop load test for the /recommend API.
+
+Replays the queries in data/train_test_data.csv (plus synthetic long job
+descriptions) at a sweep of target request rates and reports throughput,
+latency percentiles, error and 503 rates, and the saturation knee.
+
+Requests are issued on a fixed schedule regardless of how many are still
+in flight, and latency is measured from each request's scheduled start, so
+queueing delay is not hidden when the server falls behind.
+
+    python load_test.py --start-server --rates 5 10 20 40 --duration 15
+    python load_test.py --url http://127.0.0.1:8000 --slo-p99-ms 500 --slo-rate 20
+
+The labeled queries are exactly the API's precomputed answer table, so a
+server started with --start-server runs with SHL_ANSWER_TABLE=0 and every
+request exercises the model; pass --answer-table to measure the mix real
+traffic would see. Set SHL_ANSWER_TABLE=0 yourself when targeting --url.
+
+Exits with status 1 if an SLO threshold is breached.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+FILLER_SECTIONS = [
+    "About Us\nWe are a fast-growing company with offices worldwide and a culture of ownership.",
+    "Responsibilities:\nDesign, build and maintain services; review code; mentor junior engineers; "
+    "work with product managers and business stakeholders to refine requirements.",
+    "Requirements:\nStrong communication skills, attention to detail, problem solving, "
+    "experience with agile teams, ability to prioritise under pressure.",
+    "Benefits\nHealth insurance, pension plan, flexible hours, learning budget, hybrid working.",
+    "Equal Opportunity\nWe are an equal opportunity employer and value diversity at our company.",
+]
+
+
+def load_queries(data_csv: Path, n_long: int, long_words: int, seed: int = 0) -> List[str]:
+    with open(data_csv, newline="", encoding="utf-8") as f:
+        queries = list(dict.fromkeys(row["Query"].strip() for row in csv.DictReader(f) if row["Query"].strip()))
+    rng = random.Random(seed)
+    for _ in range(n_long):
+        parts = [rng.choice(queries)]
+        while sum(len(p.split()) for p in parts) < long_words:
+            parts.append(rng.choice(FILLER_SECTIONS))
+        queries.append("\n\n".join(parts))
+    return queries
+
+
+def percentile(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return float("nan")
+    k = min(len(sorted_vals) - 1, max(0, int(round(p / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+async def run_step(client: httpx.AsyncClient, url: str, queries: List[str], rate: float,
+                   duration: float, timeout: float) -> Dict:
+    n = max(1, int(rate * duration))
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    in_flight = 0
+    peak_in_flight = 0
+
+    async def one(query: str, scheduled: float) -> None:
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        try:
+            r = await client.post(f"{url}/recommend", json={"query": query}, timeout=timeout)
+            key = str(r.status_code)
+        except httpx.TimeoutException:
+            key = "timeout"
+        except httpx.HTTPError:
+            key = "conn_error"
+        finally:
+            in_flight -= 1
+        statuses[key] = statuses.get(key, 0) + 1
+        latencies.append((time.perf_counter() - scheduled) * 1000.0)
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(n):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(queries[i % len(queries)], scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ok = statuses.get("200", 0)
+    return {
+        "offered_rps": rate,
+        "requests": n,
+        "throughput_rps": ok / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1],
+        "error_rate": (n - ok) / n,
+        "rate_503": statuses.get("503", 0) / n,
+        "peak_in_flight": peak_in_flight,
+        "statuses": statuses,
+    }
+
+
+def find_knee(steps: List[Dict], min_efficiency: float = 0.9, latency_blowup: float = 3.0) -> Optional[float]:
+    """Highest offered rate served before throughput stalls or p99 collapses."""
+    if not steps:
+        return None
+    base_p99 = steps[0]["p99_ms"]
+    knee = None
+    for s in steps:
+        saturated = (s["throughput_rps"] < min_efficiency * s["offered_rps"]
+                     or s["p99_ms"] > latency_blowup * base_p99)
+        if saturated:
+            break
+        knee = s["offered_rps"]
+    return knee
+
+
+def check_slo(steps: List[Dict], p99_ms: Optional[float], max_error_rate: Optional[float],
+              at_rate: Optional[float]) -> List[str]:
+    breaches = []
+    for s in steps:
+        if at_rate is not None and s["offered_rps"] > at_rate:
+            continue
+        if p99_ms is not None and s["p99_ms"] > p99_ms:
+            breaches.append(f"{s['offered_rps']:g} rps: p99 {s['p99_ms']:.0f} ms > {p99_ms:g} ms")
+        if max_error_rate is not None and s["error_rate"] > max_error_rate:
+            breaches.append(f"{s['offered_rps']:g} rps: error rate {s['error_rate']:.1%} > {max_error_rate:.1%}")
+    return breaches
+
+
+def start_server(port: int, answer_table: bool = False) -> subprocess.Popen:
+    env = os.environ.copy()
+    if not answer_table:
+        env["SHL_ANSWER_TABLE"] = "0"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("Server exited during startup")
+        try:
+            # /ready, not /health: the model loads in the background after startup.
+            r = httpx.get(f"{url}/ready", timeout=1)
+            if r.status_code == 200:
+                return proc
+            if r.json().get("detail") == "failed":
+                proc.terminate()
+                raise SystemExit("Server failed to load the recommender")
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise SystemExit("Server did not become ready in time")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def sweep(args, queries: List[str]) -> List[Dict]:
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    steps = []
+    async with httpx.AsyncClient(limits=limits) as client:
+        # Warm-up so model/JIT start-up cost does not land in the first step.
+        for q in queries[:5]:
+            r = await client.post(f"{args.url}/recommend", json={"query": q}, timeout=args.timeout)
+            if r.status_code != 200:
+                raise SystemExit(f"Warm-up request failed with HTTP {r.status_code}; is the model loaded?")
+        for rate in args.rates:
+            step = await run_step(client, args.url, queries, rate, args.duration, args.timeout)
+            steps.append(step)
+            print(f"{rate:>8g} {step['throughput_rps']:>10.1f} {step['p50_ms']:>9.1f} {step['p90_ms']:>9.1f} "
+                  f"{step['p99_ms']:>9.1f} {step['error_rate']:>7.1%} {step['rate_503']:>7.1%} "
+                  f"{step['peak_in_flight']:>9d}")
+    return steps
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Open-loop load test for /recommend")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-server", action="store_true", help="Launch backend.app:app locally on a free port")
+    parser.add_argument("--answer-table", action="store_true",
+                        help="Keep the precomputed answer table on in the --start-server instance")
+    parser.add_argument("--data", default="data/train_test_data.csv")
+    parser.add_argument("--rates", type=float, nargs="+", default=[2, 5, 10, 20, 40, 80])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per rate step")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--long-jds", type=int, default=10, help="Number of synthetic long JDs to add")
+    parser.add_argument("--long-jd-words", type=int, default=1500)
+    parser.add_argument("--slo-p99-ms", type=float, default=None)
+    parser.add_argument("--slo-error-rate", type=float, default=None)
+    parser.add_argument("--slo-rate", type=float, default=None,
+                        help="Only enforce SLOs at or below this offered rate")
+    parser.add_argument("--json", default=None, help="Write the full report to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    queries = load_queries(Path(args.data), args.long_jds, args.long_jd_words)
+    random.Random(1).shuffle(queries)
+
+    server = None
+    if args.start_server:
+        port = free_port()
+        args.url = f"http://127.0.0.1:{port}"
+        server = start_server(port, answer_table=args.answer_table)
+
+    try:
+        print(f"Target: {args.url}  queries: {len(queries)}  {args.duration:g}s per step")
+        print(f"{'offered':>8} {'achieved':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+              f"{'errors':>7} {'503s':>7} {'inflight':>9}")
+        steps = asyncio.run(sweep(args, queries))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    knee = find_knee(steps)
+    print(f"\nSaturation knee: {knee:g} rps" if knee is not None else "\nSaturation knee: below lowest rate")
+    breaches = check_slo(steps, args.slo_p99_ms, args.slo_error_rate, args.slo_rate)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"steps": steps, "knee_rps": knee, "slo_breaches": breaches}, indent=2))
+
+    if breaches:
+        print("SLO BREACHED:")
+        for b in breaches:
+            print(f"  - {b}")
+        sys.exit(1)
+    if args.slo_p99_ms is not None or args.slo_error_rate is not None:
+        print("SLO OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Replay captured query logs and compare latency and result drift.
+
+Feeds the records written by the API's query log (SHL_QUERY_LOG_DIR) back
+through an in-process Recommender or a running HTTP instance. It then
+compares latency with what was logged and how far the top-10 results have
+drifted, e.g. between catalog or model versions.
+
+    python replay_queries.py logs/                       # in-process Recommender
+    python replay_queries.py logs/ --url http://127.0.0.1:8000
+    python replay_queries.py logs/ --offline --json drift.json
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from backend.querylog import is_redacted, read_query_logs
+from load_test import percentile
+
+
+def overlap_at_k(a: List[str], b: List[str], k: int = 10) -> float:
+    if not a and not b:
+        return 1.0
+    return len(set(a[:k]) & set(b[:k])) / max(1, min(k, max(len(a), len(b))))
+
+
+def replayable(records: List[Dict]) -> Tuple[List[Dict], int]:
+    """Successful records whose query is intact, plus how many were skipped as redacted.
+
+    A redacted query is not what the model ranked, so replaying it would
+    report drift that is only the masking.
+    """
+    ok = [r for r in records if r.get("status") == 200]
+    kept = [r for r in ok if not is_redacted(r["query"])]
+    return kept, len(ok) - len(kept)
+
+
+def latency_by_source(details: List[Dict]) -> Dict[str, Tuple[List[float], List[float]]]:
+    """Sorted logged and replayed latencies per logged `source`.
+
+    Answer-table hits were served in well under a millisecond; replay sends
+    them through the model, so pooling them with model-served records would
+    compare different code paths.
+    """
+    groups: Dict[str, Tuple[List[float], List[float]]] = {}
+    for d in details:
+        if "error" in d:
+            continue
+        logged, replayed = groups.setdefault(d.get("source") or "unknown", ([], []))
+        if d["logged_ms"] is not None:
+            logged.append(d["logged_ms"])
+        replayed.append(d["replay_ms"])
+    for logged, replayed in groups.values():
+        logged.sort()
+        replayed.sort()
+    return dict(sorted(groups.items()))
+
+
+def make_runner(args):
+    if args.url:
+        import httpx
+
+        client = httpx.Client(base_url=args.url, timeout=args.timeout)
+
+        def run_http(record: Dict) -> List[str]:
+            payload = {"query": record["query"]}
+            if record.get("mmr_lambda") is not None:
+                payload["mmr_lambda"] = record["mmr_lambda"]
+            r = client.post("/recommend", json=payload)
+            r.raise_for_status()
+            return [a["url"] for a in r.json()["recommended_assessments"]]
+
+        return run_http, f"HTTP {args.url}"
+
+    if args.offline:
+        from backend.offline import offline_recommender
+        recommender = offline_recommender()
+    else:
+        from backend.recommender import Recommender
+        recommender = Recommender()
+
+    def run_local(record: Dict) -> List[str]:
+        results = recommender.recommend(
+            record["query"], top_k=record.get("top_k", 10), mmr_lambda=record.get("mmr_lambda"),
+        )
+        return [a["url"] for a in results]
+
+    return run_local, f"in-process ({recommender.fingerprint()}, catalog {recommender.catalog.version})"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay captured query logs")
+    parser.add_argument("logs", nargs="+", help="Log files or directories of querylog-*.jsonl.gz")
+    parser.add_argument("--url", default=None, help="Replay against a running API instead of in-process")
+    parser.add_argument("--offline", action="store_true", help="Use the offline fixture recommender")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", default=None, help="Write per-query drift details to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    records, redacted = replayable(list(read_query_logs(args.logs)))
+    if redacted:
+        print(f"Skipping {redacted} queries with redacted PII (<email>/<phone>)")
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        raise SystemExit("No successful queries found in the given logs.")
+
+    run, target = make_runner(args)
+    print(f"Replaying {len(records)} queries against {target}")
+    versions = Counter((r.get("catalog_version"), r.get("model")) for r in records)
+    for (catalog, model), n in versions.most_common():
+        print(f"  logged with catalog {catalog}, model {model}: {n} queries")
+
+    details = []
+    errors = 0
+    for record in records:
+        start = time.perf_counter()
+        try:
+            urls = run(record)
+        except Exception as e:
+            errors += 1
+            details.append({"query": record["query"], "error": str(e)})
+            continue
+        latency = (time.perf_counter() - start) * 1000.0
+        logged = record.get("results", [])
+        details.append({
+            "query": record["query"],
+            "source": record.get("source"),
+            "logged_ms": record.get("latency_ms"),
+            "replay_ms": latency,
+            "overlap_at_10": overlap_at_k(logged, urls),
+            "top1_changed": bool(logged[:1] != urls[:1]),
+            "identical": logged == urls,
+        })
+
+    ok = [d for d in details if "error" not in d]
+    print(f"\n{'source':>12} {'':>7} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for source, (logged_ms, replay_ms) in latency_by_source(details).items():
+        for name, vals in (("logged", logged_ms), ("replay", replay_ms)):
+            print(f"{source:>12} {name:>7} {len(vals):>6} {percentile(vals, 50):>9.1f} "
+                  f"{percentile(vals, 95):>9.1f} {percentile(vals, 99):>9.1f}")
+    if "answers" in {d.get("source") for d in ok}:
+        print("  (answers were logged from the precomputed table; replay ranks them with the model)")
+
+    if ok:
+        print(f"\nMean overlap@10: {sum(d['overlap_at_10'] for d in ok) / len(ok):.3f}")
+        print(f"Identical rankings: {sum(d['identical'] for d in ok) / len(ok):.1%}")
+        print(f"Top-1 changed: {sum(d['top1_changed'] for d in ok) / len(ok):.1%}")
+        print("\nLargest drift:")
+        for d in sorted(ok, key=lambda d: d["overlap_at_10"])[:5]:
+            print(f"  {d['overlap_at_10']:.2f}  {d['query'][:80]}")
+    if errors:
+        print(f"\nErrors: {errors}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(details, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Tests for the load-test report logic: percentiles, knee detection and SLO checks.
+    python -m pytest -q test_load_test.py
+"""
+import math
+
+from load_test import check_slo, find_knee, percentile
+
+
+def step(rate, achieved, p99, errors=0.0):
+    return {"offered_rps": rate, "throughput_rps": achieved, "p99_ms": p99, "error_rate": errors}
+
+
+STEPS = [step(5, 5.0, 40), step(10, 9.9, 45), step(20, 19.5, 60), step(40, 28.0, 900, errors=0.05)]
+
+
+def test_percentile_uses_nearest_rank():
+    vals = [float(v) for v in range(1, 101)]
+    assert percentile(vals, 50) == 51.0
+    assert percentile(vals, 99) == 99.0
+    assert percentile(vals, 100) == 100.0
+    assert percentile([7.0], 99) == 7.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_knee_is_last_rate_before_saturation():
+    assert find_knee(STEPS) == 20
+
+
+def test_knee_on_latency_blowup_alone():
+    steps = [step(5, 5.0, 40), step(10, 10.0, 130), step(20, 20.0, 200)]
+    assert find_knee(steps) == 5
+
+
+def test_knee_below_lowest_rate():
+    assert find_knee([step(5, 3.0, 40), step(10, 4.0, 80)]) is None
+    assert find_knee([]) is None
+
+
+def test_slo_breach_is_reported():
+    breaches = check_slo(STEPS, p99_ms=500, max_error_rate=0.01, at_rate=None)
+    assert breaches == ["40 rps: p99 900 ms > 500 ms", "40 rps: error rate 5.0% > 1.0%"]
+
+
+def test_slo_rate_filter_ignores_higher_rates():
+    assert check_slo(STEPS, p99_ms=500, max_error_rate=0.01, at_rate=20) == []
+    assert check_slo(STEPS, p99_ms=50, max_error_rate=None, at_rate=20) == ["20 rps: p99 60 ms > 50 ms"]
+
+
+def test_no_thresholds_means_no_breaches():
+    assert check_slo(STEPS, p99_ms=None, max_error_rate=None, at_rate=None) == []
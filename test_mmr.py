@@ -0,0 +1,27 @@
+"""
+MMR diversity selection tests, unit and through the API.
+    python -m pytest -q test_mmr.py
+"""
+import numpy as np
+
+from backend.diversity import mmr_select
+
+
+def test_mmr_skips_near_duplicates():
+    relevance = np.array([0.9, 0.89, 0.8, 0.3])
+    item_sim = np.array([
+        [1.0, 0.99, 0.1, 0.2],
+        [0.99, 1.0, 0.1, 0.2],
+        [0.1, 0.1, 1.0, 0.2],
+        [0.2, 0.2, 0.2, 1.0],
+    ])
+    assert mmr_select(relevance, item_sim, 2, lam=1.0) == [0, 1]
+    assert mmr_select(relevance, item_sim, 2, lam=0.5) == [0, 2]
+
+
+def test_recommend_accepts_mmr_lambda(client):
+    r = client.post("/recommend", json={"query": "Java developer", "mmr_lambda": 0.5})
+    assert r.status_code == 200
+    urls = [a["url"] for a in r.json()["recommended_assessments"]]
+    assert len(urls) == len(set(urls))
+    assert client.post("/recommend", json={"query": "Java", "mmr_lambda": 1.5}).status_code == 422
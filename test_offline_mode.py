@@ -0,0 +1,225 @@
+"""
+Fast endpoint contract tests and a latency smoke test.
+
+Runs entirely offline: SHL_TEST_MODE boots the app on the fixture catalog
+with the deterministic hashing encoder, so no model download or torch is
+needed.
+    python -m pytest -q test_offline_mode.py
+"""
+import csv
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.answers import normalize_query
+from backend.app import model_storage
+from backend.catalog import Catalog, compile_catalog
+from backend.offline import FIXTURE_CSV, HashingEncoder, offline_recommender
+
+REQUIRED_FIELDS = {
+    "url": str,
+    "name": str,
+    "adaptive_support": str,
+    "description": str,
+    "duration": int,
+    "remote_support": str,
+    "test_type": list,
+}
+
+
+@pytest.fixture(scope="module")
+def recommender(tmp_path_factory):
+    return offline_recommender(str(tmp_path_factory.mktemp("offline")))
+
+
+def test_health(client):
+    r = client.get("/health")
+    assert r.status_code == 200
+    assert r.json() == {"status": "healthy"}
+
+
+def test_ready_reflects_model_load(client):
+    assert client.get("/ready").json() == {"status": "ready"}
+    model_storage["ready"].clear()
+    r = client.get("/ready")
+    assert r.status_code == 503 and r.json()["detail"] == "loading"
+    model_storage["ready"].set()
+    recommender = model_storage.pop("recommender")
+    try:
+        assert client.get("/ready").json()["detail"] == "failed"
+    finally:
+        model_storage["recommender"] = recommender
+
+
+def test_recommend_contract(client):
+    r = client.post("/recommend", json={"query": "Java developer who works with business teams"})
+    assert r.status_code == 200
+    data = r.json()
+    assert list(data.keys()) == ["recommended_assessments"]
+    assessments = data["recommended_assessments"]
+    assert 1 <= len(assessments) <= 10
+    for a in assessments:
+        for field, expected_type in REQUIRED_FIELDS.items():
+            assert isinstance(a[field], expected_type), field
+        assert a["url"].startswith("http")
+        assert a["adaptive_support"] in ("Yes", "No")
+        assert a["remote_support"] in ("Yes", "No")
+        assert a["duration"] > 0 and a["test_type"]
+
+
+def test_recommend_requires_query(client):
+    assert client.post("/recommend", json={}).status_code == 422
+
+
+def test_popular_queries_served_from_answer_table(client):
+    answers = model_storage["answers"]
+    query = ("  I am hiring for Java developers who can also collaborate effectively with my business teams. "
+             "Looking for an assessment(s) that can be completed in 40 minutes. ")
+    hit = answers.lookup(query.upper())
+    assert hit is not None
+    expected = model_storage["recommender"].recommend(query.strip(), top_k=10)
+    served = client.post("/recommend", json={"query": query}).json()["recommended_assessments"]
+    assert served == expected
+
+
+def test_answer_table_rebuilt_when_catalog_or_fingerprint_changes(tmp_path):
+    from backend.answers import AnswerTable, build_answer_table, ensure_answer_table
+    from backend.recommender import DEFAULT_FIELD_WEIGHTS, effective_field_weights, present_fields, ranking_fingerprint
+
+    path = tmp_path / "answers.json"
+    rec = offline_recommender(str(tmp_path / "a"))
+    build_answer_table(rec, ["Java developer"], path)
+    # The pre-load fingerprint the API checks matches the loaded recommender's.
+    weights = effective_field_weights(DEFAULT_FIELD_WEIGHTS, present_fields(rec.catalog))
+    assert AnswerTable.load(path, rec.catalog).is_current(ranking_fingerprint("offline-hashing", weights))
+
+    reweighted = offline_recommender(str(tmp_path / "b"), field_weights={"name": 1.0})
+    assert not AnswerTable.load(path, reweighted.catalog).is_current(reweighted.fingerprint())
+    rebuilt = ensure_answer_table(reweighted, path, ["Java developer"])
+    assert rebuilt.fingerprint == reweighted.fingerprint()
+
+    with open(FIXTURE_CSV, encoding="utf-8") as f:
+        rows = f.read().splitlines()
+    (tmp_path / "grown.csv").write_text("\n".join(rows + [rows[1].replace("http", "https", 1)]) + "\n")
+    grown = offline_recommender(str(tmp_path / "c"), data_csv=str(tmp_path / "grown.csv"), field_weights={"name": 1.0})
+    assert grown.fingerprint() == reweighted.fingerprint()
+    assert not AnswerTable.load(path, grown.catalog).is_current(grown.fingerprint())
+    assert ensure_answer_table(grown, path, ["Java developer"]).catalog_version == grown.catalog.version
+
+
+def test_answer_table_rebuilt_when_popular_queries_change(tmp_path):
+    from backend.answers import ensure_answer_table
+
+    path = tmp_path / "answers.json"
+    rec = offline_recommender(str(tmp_path / "work"))
+    table = ensure_answer_table(rec, path, ["Java developer"])
+    assert table.lookup("SQL analyst") is None
+    assert ensure_answer_table(rec, path, ["Java developer"]).queries_digest == table.queries_digest
+    table = ensure_answer_table(rec, path, ["Java developer", "SQL analyst"])
+    assert len(table) == 2 and table.lookup("SQL analyst") is not None
+
+
+def test_answer_table_can_be_disabled(monkeypatch):
+    from backend.app import _load_model_and_answers
+
+    monkeypatch.setenv("SHL_TEST_MODE", "1")
+    monkeypatch.setenv("SHL_ANSWER_TABLE", "0")
+    model_storage.clear()
+    ready = threading.Event()
+    try:
+        _load_model_and_answers(ready)
+        assert ready.is_set() and "recommender" in model_storage
+        assert "answers" not in model_storage
+    finally:
+        model_storage.pop("recommender").close()
+
+
+def test_normalize_query_keeps_technology_names():
+    assert normalize_query("  Hiring C++/C# and .NET devs,  Node.js! ") == "hiring c++ c# and .net devs node.js"
+
+
+def test_hashing_encoder_is_deterministic():
+    a = HashingEncoder().encode(["Core Java developer", "SQL analyst"])
+    b = HashingEncoder().encode(["Core Java developer", "SQL analyst"])
+    assert a.shape == (2, 384)
+    assert np.array_equal(a, b)
+    assert np.allclose(np.linalg.norm(a, axis=1), 1.0)
+
+
+def test_catalog_round_trip(tmp_path):
+    cat = Catalog(compile_catalog(FIXTURE_CSV, tmp_path / "catalog.bin"))
+    with open(FIXTURE_CSV, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(cat) == len(rows)
+    for i, row in enumerate(rows):
+        assert cat.row(i) == {k: v.strip() if k == "type" else v for k, v in row.items()}
+
+
+def test_field_embeddings_are_mmapped_and_absent_fields_dropped(recommender):
+    assert isinstance(recommender.field_embeddings, np.memmap)
+    # The fixture has no "details" column, so its weight is redistributed.
+    assert "details" not in recommender.present_fields
+    assert "details" not in recommender.field_weights
+    assert sum(recommender.field_weights.values()) == pytest.approx(1.0)
+
+
+def test_weights_on_absent_fields_only_are_rejected(tmp_path):
+    rec = offline_recommender(str(tmp_path))
+    before = rec.field_weights
+    with pytest.raises(ValueError, match="No positive weight"):
+        rec.set_field_weights({"details": 1.0})
+    assert rec.field_weights == before
+
+
+def test_default_work_dir_is_removed_on_close():
+    rec = offline_recommender()
+    work = Path(rec.tmpdir.name)
+    assert (work / "catalog.bin").exists()
+    rec.close()
+    assert not work.exists()
+
+
+def test_catalog_recompiled_when_csv_replaced_with_older_mtime(tmp_path):
+    import os
+
+    from backend.catalog import catalog_version, load_catalog
+
+    csv_path, bin_path = tmp_path / "assessments.csv", tmp_path / "catalog.bin"
+    rows = open(FIXTURE_CSV, encoding="utf-8").read().splitlines()
+    csv_path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    assert len(load_catalog(csv_path, bin_path)) == len(rows) - 1
+    csv_path.write_text("\n".join(rows[:3]) + "\n", encoding="utf-8")
+    old = bin_path.stat().st_mtime - 100
+    os.utime(csv_path, (old, old))  # as after `cp -p` of an older file
+    cat = load_catalog(csv_path, bin_path)
+    assert len(cat) == 2 and cat.version == catalog_version(csv_path)
+
+
+def test_offline_ranking_is_sensible(recommender):
+    names = [r["name"] for r in recommender.recommend("Core Java programming", top_k=3)]
+    assert any("Java" in n for n in names)
+
+
+def test_long_query_is_chunked(recommender):
+    jd = "Python developer building data pipelines. " * 400
+    # 2400 words are capped at 512 and split into overlapping 128-word chunks.
+    assert recommender._embed_query(jd).shape == (5, 384)
+    results = recommender.recommend(jd, top_k=5)
+    assert len(results) == 5
+
+
+def test_latency_smoke(tmp_path):
+    start = time.perf_counter()
+    rec = offline_recommender(str(tmp_path))
+    boot_ms = (time.perf_counter() - start) * 1000
+    queries = ["Java developer", "sales representative", "numerical reasoning", "personality"] * 25
+    start = time.perf_counter()
+    for q in queries:
+        rec.recommend(q, top_k=10)
+    per_query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    # Generous bounds: this only catches order-of-magnitude regressions.
+    assert boot_ms < 2000
+    assert per_query_ms < 50
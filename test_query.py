@@ -0,0 +1,82 @@
+"""
+Long-query preprocessing tests: salient-section extraction, chunking and pooling.
+    python -m pytest -q test_query.py
+"""
+import numpy as np
+import pytest
+
+from backend.offline import offline_recommender
+from backend.query import chunk_query, extract_salient
+
+BODY = "Design and review data protection controls for our Java services. " * 30
+
+
+def numbered(n):
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def test_short_query_is_a_single_unmodified_chunk():
+    assert chunk_query("  Java   developer ", chunk_tokens=8) == ["Java developer"]
+
+
+def test_chunks_overlap_and_cover_the_text():
+    chunks = chunk_query(numbered(300), chunk_tokens=128, max_tokens=512, overlap=16)
+    assert [len(c.split()) for c in chunks] == [128, 128, 76]
+    first, second = chunks[0].split(), chunks[1].split()
+    assert first[-16:] == second[:16]
+    assert chunks[-1].split()[-1] == "w299"
+
+
+def test_word_budget_caps_the_query():
+    chunks = chunk_query(numbered(2000), chunk_tokens=100, max_tokens=250, overlap=0)
+    words = " ".join(chunks).split()
+    assert len(chunks) == 3 and len(words) == 250
+    assert words[-1] == "w249"
+
+
+def test_boilerplate_sections_are_dropped():
+    jd = "\n".join([
+        "Data Engineer",
+        "Build SQL pipelines in Python.",
+        "About Us:",
+        "We are a fast-growing company.",
+        "Requirements:",
+        "Strong SQL.",
+        "BENEFITS & PERKS",
+        "Free lunch.",
+        "## Equal Opportunity Employer",
+        "We welcome everyone.",
+    ])
+    assert extract_salient(jd) == "Data Engineer Build SQL pipelines in Python. Requirements: Strong SQL."
+
+
+@pytest.mark.parametrize("title", ["Privacy Engineer", "Compensation Analyst", "Benefits Specialist",
+                                   "Diversity Recruiter"])
+def test_job_titles_that_look_like_boilerplate_are_kept(title):
+    jd = f"{title}\n{BODY}\nWho We Are\nA company blurb.\nRequirements:\nFive years of experience."
+    salient = extract_salient(jd)
+    assert salient.startswith(f"{title} Design and review")
+    assert "company blurb" not in salient and salient.endswith("Five years of experience.")
+    assert chunk_query(jd)[0].startswith(title)
+
+
+def test_boilerplate_first_line_is_kept():
+    assert extract_salient("Benefits\nMedical cover.").startswith("Benefits Medical")
+
+
+@pytest.mark.parametrize("pooling", ["max", "mean"])
+def test_chunk_scores_are_pooled(tmp_path, pooling):
+    rec = offline_recommender(str(tmp_path), chunk_tokens=32, chunk_pooling=pooling)
+    jd = "Java developer writing backend services. " * 20 + "Sales representative handling accounts. " * 20
+    q = rec._embed_query(jd)
+    assert len(q) > 1
+    sims = rec.embeddings @ q.T
+    expected = sims.max(axis=1) if pooling == "max" else sims.mean(axis=1)
+    got = rec.search(jd, top_n=5)
+    assert [i for i, _ in got] == list(np.argsort(-expected)[:5])
+    assert np.allclose([s for _, s in got], np.sort(expected)[::-1][:5], atol=1e-6)
+
+
+def test_unknown_pooling_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        offline_recommender(str(tmp_path), chunk_pooling="median")
@@ -0,0 +1,77 @@
+"""
+Asynchronous query log tests.
+    python -m pytest -q test_query_log.py
+"""
+import pytest
+
+from backend.app import model_storage
+from backend.querylog import QueryLogWriter, read_query_logs, redact
+from replay_queries import latency_by_source, replayable
+
+
+def test_query_log_redacts_batches_and_rotates(tmp_path):
+    writer = QueryLogWriter(tmp_path, batch_size=5, flush_interval=0.05, max_bytes=1)
+    for i in range(12):
+        assert writer.log({"query": f"Java dev {i}, mail jo.doe@example.com or +44 20 7946 0958"})
+    writer.close()
+    records = list(read_query_logs([tmp_path]))
+    assert [r["query"] for r in records] == [f"Java dev {i}, mail <email> or <phone>" for i in range(12)]
+    assert len(list(tmp_path.glob("querylog-*.jsonl.gz"))) > 1
+    assert writer.written == 12 and writer.dropped == 0
+
+
+@pytest.mark.parametrize("text", [
+    "+44 20 7946 0958", "(555) 123-4567", "555-123-4567", "555.123.4567", "020 7946 0958", "+14155550123",
+])
+def test_phone_numbers_are_redacted(text):
+    assert redact(f"call {text}, thanks") == "call <phone>, thanks"
+
+
+@pytest.mark.parametrize("text", [
+    "2019-2023", "2019 - 2023", "1999-2003 2005-2010", "100000 - 120000", "100000-120000",
+    "120,000-150,000", "12.5.2024", "12.05.2024-31.12.2025", "10.2.3.4", "1234567",
+])
+def test_ranges_dates_and_short_numbers_are_not_redacted(text):
+    assert redact(f"Java developer {text} in London") == f"Java developer {text} in London"
+
+
+@pytest.fixture
+def app_env(tmp_path):
+    return {"SHL_QUERY_LOG_DIR": str(tmp_path)}
+
+
+def test_failed_requests_are_logged_with_status_500(tmp_path, monkeypatch, client):
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(model_storage["recommender"], "recommend", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/recommend", json={"query": "an unseen query about forklifts"})
+    model_storage["query_log"].close()
+    records = list(read_query_logs([tmp_path]))
+    assert [(r["status"], r["source"], r["results"]) for r in records] == [(500, "model", [])]
+
+
+def test_replay_skips_redacted_and_failed_records():
+    records = [
+        {"query": "Java developer", "status": 200},
+        {"query": "Java developer, mail <email>", "status": 200},
+        {"query": "call <phone> about sales roles", "status": 200},
+        {"query": "SQL analyst", "status": 500},
+    ]
+    kept, redacted = replayable(records)
+    assert [r["query"] for r in kept] == ["Java developer"]
+    assert redacted == 2
+
+
+def test_replay_latencies_are_grouped_by_source():
+    details = [
+        {"source": "answers", "logged_ms": 0.05, "replay_ms": 12.0},
+        {"source": "model", "logged_ms": 15.0, "replay_ms": 14.0},
+        {"source": "model", "logged_ms": 11.0, "replay_ms": 13.0},
+        {"source": "model", "error": "timeout"},
+    ]
+    assert latency_by_source(details) == {
+        "answers": ([0.05], [12.0]),
+        "model": ([11.0, 15.0], [13.0, 14.0]),
+    }
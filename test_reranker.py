@@ -0,0 +1,70 @@
+"""
+Cross-encoder re-ranker tests with an injected fake model.
+
+No model download is needed: FakeCrossEncoder scores a pair by the item
+text's length and can be made slow to exercise the latency budget.
+    python -m pytest -q test_reranker.py
+"""
+import time
+
+from backend.reranker import CrossEncoderReranker
+
+TEXTS = {0: "a", 1: "bbb", 2: "cc", 3: "dddd"}
+CANDS = [(0, 0.9), (1, 0.8), (2, 0.7)]
+
+
+class FakeCrossEncoder:
+    def __init__(self, delay_s: float = 0.0) -> None:
+        self.delay_s = delay_s
+        self.pairs_scored = 0
+
+    def predict(self, pairs, batch_size=32):
+        time.sleep(self.delay_s)
+        self.pairs_scored += len(pairs)
+        return [float(len(text)) for _, text in pairs]
+
+
+def make(delay_s=0.0, **kwargs):
+    model = FakeCrossEncoder(delay_s)
+    return model, CrossEncoderReranker("fake", model=model, **kwargs)
+
+
+def test_reorders_by_cross_encoder_score():
+    _, rr = make(budget_ms=None)
+    assert [i for i, _ in rr.rerank("q", CANDS, TEXTS.get)] == [1, 2, 0]
+
+
+def test_repeated_query_is_served_from_cache():
+    model, rr = make(budget_ms=None)
+    first = rr.rerank("q", CANDS, TEXTS.get)
+    assert rr.rerank("q", CANDS, TEXTS.get) == first
+    assert model.pairs_scored == 3
+    assert rr.stats["cache_hits"] == 3
+
+
+def test_slow_pass_falls_back_but_caches_scores():
+    model, rr = make(delay_s=0.05, budget_ms=10)
+    assert rr.rerank("q", CANDS, TEXTS.get) == CANDS
+    assert rr.stats["fallbacks"] == 1
+    # Scores from the slow pass were kept, so the repeat is re-ranked for free.
+    assert [i for i, _ in rr.rerank("q", CANDS, TEXTS.get)] == [1, 2, 0]
+    assert model.pairs_scored == 3
+
+
+def test_predicted_over_budget_skips_the_model():
+    model, rr = make(delay_s=0.05, budget_ms=10)
+    rr.rerank("q", CANDS, TEXTS.get)
+    assert rr.rerank("other", CANDS, TEXTS.get) == CANDS
+    assert rr.stats["skipped"] == 1
+    assert model.pairs_scored == 3
+
+
+def test_cache_evicts_least_recently_used():
+    model, rr = make(budget_ms=None, cache_size=3)
+    rr.rerank("q", CANDS, TEXTS.get)
+    rr.rerank("q", [(3, 0.5)], TEXTS.get)  # evicts ("q", 0), the oldest entry
+    assert ("q", 0) not in rr._cache and ("q", 3) in rr._cache
+    # Re-scoring 0 overflows the cache again; the query's own candidates survive.
+    assert [i for i, _ in rr.rerank("q", CANDS, TEXTS.get)] == [1, 2, 0]
+    assert model.pairs_scored == 5
+    assert len(rr._cache) == 3
@@ -0,0 +1,31 @@
+"""
+Semantic near-duplicate query cache tests.
+    python -m pytest -q test_semantic_cache.py
+"""
+from backend.cache import SemanticCache
+from backend.offline import HashingEncoder, offline_recommender
+
+
+def test_semantic_cache_hits_paraphrases_and_evicts_lru():
+    enc = HashingEncoder()
+    java, sales, excel = enc.encode(["Core Java developer test", "sales representative", "excel reporting"])
+    cache = SemanticCache(384, capacity=2, threshold=0.9)
+    cache.put(java, "java", params=10)
+    cache.put(sales, "sales", params=10)
+    paraphrase = enc.encode(["core  java developer test!"])[0]
+    assert cache.get(paraphrase, params=10) == "java"
+    assert cache.get(paraphrase, params=5) is None
+    cache.put(excel, "excel", params=10)  # evicts "sales", the least recently used
+    assert cache.get(sales, params=10) is None
+    assert cache.get(java, params=10) == "java"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_changing_field_weights_clears_the_cache(tmp_path):
+    rec = offline_recommender(str(tmp_path), semantic_cache_threshold=0.97)
+    before = rec.rank("Core Java programming")
+    assert rec.cache.stats()["size"] == 1
+    rec.set_field_weights({"type": 1.0})
+    assert rec.cache.stats()["size"] == 0
+    assert rec.rank("Core Java programming") != before
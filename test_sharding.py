@@ -0,0 +1,98 @@
+"""
+Sharded search tests: parity with the in-process scan, growth and rebalancing.
+
+Shard workers are spawned processes, so these take a few seconds.
+    python -m pytest -q test_sharding.py
+"""
+import numpy as np
+import pytest
+
+from backend.offline import offline_recommender
+from backend.sharding import ShardedIndex
+
+
+def brute_force(embeddings, q, top_n):
+    sims = embeddings @ q
+    idx = np.argsort(-sims)[:top_n]
+    return [(int(i), float(sims[i])) for i in idx]
+
+
+def unit_rows(rng, n, dim=16):
+    x = rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def index():
+    rng = np.random.default_rng(0)
+    idx = ShardedIndex(unit_rows(rng, 40), 2, max_imbalance=1.25)
+    yield rng, idx
+    idx.close()
+
+
+def test_sharded_search_matches_in_process(tmp_path):
+    recommender = offline_recommender(str(tmp_path))
+    index = ShardedIndex(recommender.embeddings, 2)
+    try:
+        q = recommender._embed_query("SQL and Excel reporting")
+        expected = recommender.search("SQL and Excel reporting", top_n=5)
+        got = index.search(q, top_n=5)
+    finally:
+        index.close()
+    assert [i for i, _ in got] == [i for i, _ in expected]
+    assert np.allclose([s for _, s in got], [s for _, s in expected])
+
+
+def test_append_goes_to_smallest_shard_and_rebalances(index):
+    rng, idx = index
+    assert idx.shard_sizes == [20, 20]
+    idx.append(unit_rows(rng, 3))
+    assert idx.shard_sizes == [23, 20]
+    idx.append(unit_rows(rng, 2))
+    assert idx.shard_sizes == [23, 22]
+    idx.append(unit_rows(rng, 20))  # 42 > 1.25 * mean, so repartition evenly
+    assert idx.shard_sizes == [32, 33]
+    assert sum(idx.shard_sizes) == len(idx.embeddings) == 65
+
+
+def test_results_match_brute_force_after_growth(index):
+    rng, idx = index
+    for n in (5, 30, 1):
+        idx.append(unit_rows(rng, n))
+    q = unit_rows(rng, 1)[0]
+    got = idx.search(q, top_n=10)
+    expected = brute_force(idx.embeddings, q, 10)
+    assert [i for i, _ in got] == [i for i, _ in expected]
+    assert np.allclose([s for _, s in got], [s for _, s in expected])
+
+
+def test_max_shard_rows_adds_shards():
+    rng = np.random.default_rng(1)
+    idx = ShardedIndex(unit_rows(rng, 10), 1, max_shard_rows=8)
+    try:
+        assert idx.n_shards == 2
+        idx.append(unit_rows(rng, 10))
+        assert idx.n_shards == 3 and max(idx.shard_sizes) <= 8
+    finally:
+        idx.close()
+
+
+def test_sharded_recommender_follows_field_weight_changes(tmp_path):
+    sharded = offline_recommender(str(tmp_path / "sharded"), shards=2)
+    plain = offline_recommender(str(tmp_path / "plain"))
+    try:
+        assert sharded.index is not None and sharded.index.n_shards == 2
+        for weights in (None, {"name": 1.0}, {"type": 0.7, "description": 0.3}):
+            if weights is not None:
+                # Goes through ShardedIndex.reset() on the sharded side.
+                sharded.set_field_weights(weights)
+                plain.set_field_weights(weights)
+            for query in ("SQL and Excel reporting", "Core Java programming"):
+                got, expected = sharded.search(query, top_n=5), plain.search(query, top_n=5)
+                assert np.allclose([s for _, s in got], [s for _, s in expected])
+                # Ids may swap only between exactly tied scores.
+                full = (plain.embeddings @ plain._embed_query(query).T).max(axis=1)
+                assert np.allclose([full[i] for i, _ in got], [s for _, s in got])
+    finally:
+        sharded.close()
+        plain.close()